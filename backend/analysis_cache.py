@@ -0,0 +1,105 @@
+import os
+import json
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from config import env_flag, lazy_singleton
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'analysis_cache')
+
+def analysis_cache_key(file_bytes, version):
+    # Same file analysed with the same prompt and models -> same key
+    return f"{hashlib.sha256(file_bytes).hexdigest()}:{version}"
+
+class AnalysisCache:
+    """Two-tier cache of parsed CV analyses.
+
+    A bounded in-memory LRU sits in front of one JSON file per entry on
+    disk. Disk entries older than ttl_seconds are treated as missing and
+    removed. Only the analysis is cached; job recommendations are
+    computed fresh on every request.
+    """
+
+    def __init__(self, directory=DEFAULT_CACHE_DIR, max_memory_entries=128, ttl_seconds=7 * 24 * 3600):
+        self.directory = directory
+        self.max_memory_entries = max_memory_entries
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.directory, hashlib.sha256(key.encode('utf-8')).hexdigest() + '.json')
+
+    def _remember(self, key, created, value):
+        self._memory[key] = (created, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+
+    def get(self, key):
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry and now - entry[0] < self.ttl_seconds:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self._memory.pop(key, None)
+
+        path = self._path(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            entry = None
+
+        if entry is None or now - entry.get('created', 0) >= self.ttl_seconds:
+            if entry is not None:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            with self._lock:
+                self.misses += 1
+            return None
+
+        with self._lock:
+            self._remember(key, entry['created'], entry['value'])
+            self.hits += 1
+        return entry['value']
+
+    def put(self, key, value):
+        created = time.time()
+        with self._lock:
+            self._remember(key, created, value)
+
+        # Write to a temporary file first so readers never see half an entry
+        path = self._path(key)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'key': key, 'created': created, 'value': value}, f)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"Analysis cache write error: {str(e)}")
+
+    @property
+    def stats(self):
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'memory_entries': len(self._memory)}
+
+@lazy_singleton
+def _shared_cache():
+    return AnalysisCache(
+        directory=os.getenv("ANALYSIS_CACHE_DIR", DEFAULT_CACHE_DIR),
+        max_memory_entries=int(os.getenv("ANALYSIS_CACHE_MEMORY_ENTRIES", "128")),
+        ttl_seconds=float(os.getenv("ANALYSIS_CACHE_TTL_HOURS", "168")) * 3600
+    )
+
+def get_analysis_cache():
+    """Shared cache instance, or None when ANALYSIS_CACHE=0."""
+    return _shared_cache() if env_flag("ANALYSIS_CACHE", True) else None
@@ -0,0 +1,120 @@
+import os
+import time
+import uuid
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from config import lazy_singleton
+from gemini_analyzer import RESET_SECTION
+
+class QueueFullError(Exception):
+    pass
+
+class AnalysisJob:
+    """State of one background analysis, shared with the polling and SSE endpoints."""
+
+    def __init__(self):
+        self.id = uuid.uuid4().hex
+        self.status = 'queued'
+        self.sections = {}
+        self.events = []
+        self.result = None
+        self.error = None
+        self.created = time.time()
+        self.finished = None
+        self._condition = threading.Condition()
+
+    def emit(self, name, value):
+        with self._condition:
+            if name == RESET_SECTION:
+                # The sections so far were superseded and are sent again
+                self.sections.clear()
+            else:
+                self.sections[name] = value
+            self.events.append((name, value))
+            self._condition.notify_all()
+
+    def _finish(self, status, result=None, error=None):
+        with self._condition:
+            self.status = status
+            self.result = result
+            self.error = error
+            self.finished = time.time()
+            self._condition.notify_all()
+
+    @property
+    def done(self):
+        return self.status in ('done', 'error')
+
+    def wait_for_events(self, cursor, timeout=15.0):
+        """Block until there are events past cursor or the job ends.
+
+        Returns (new_events, done). Returns no events when the timeout
+        runs out first, so the caller can send a keep-alive.
+        """
+        with self._condition:
+            self._condition.wait_for(lambda: len(self.events) > cursor or self.done, timeout=timeout)
+            return list(self.events[cursor:]), self.done
+
+    def to_dict(self):
+        with self._condition:
+            return {
+                'jobId': self.id,
+                'status': self.status,
+                'sections': dict(self.sections),
+                'result': self.result,
+                'error': self.error
+            }
+
+class AnalysisJobManager:
+    """Runs analyses on a bounded thread pool so request threads return at once.
+
+    At most max_pending jobs may be queued or running; submit raises
+    QueueFullError past that. Finished jobs are kept for
+    retention_seconds so clients can still fetch their result.
+    """
+
+    def __init__(self, workers=2, max_pending=32, retention_seconds=3600):
+        self.max_pending = max_pending
+        self.retention_seconds = retention_seconds
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='cv-analysis')
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def _prune(self):
+        cutoff = time.time() - self.retention_seconds
+        for job_id in [job_id for job_id, job in self._jobs.items() if job.finished and job.finished < cutoff]:
+            del self._jobs[job_id]
+
+    def submit(self, fn, *args, **kwargs):
+        """Run fn(*args, emit=job.emit, **kwargs) in the background and return the job."""
+        with self._lock:
+            self._prune()
+            pending = sum(1 for job in self._jobs.values() if not job.done)
+            if pending >= self.max_pending:
+                raise QueueFullError(f"{pending} analyses already pending")
+            job = AnalysisJob()
+            self._jobs[job.id] = job
+
+        self._executor.submit(self._run, job, fn, args, kwargs)
+        return job
+
+    def _run(self, job, fn, args, kwargs):
+        job.status = 'running'
+        try:
+            job._finish('done', result=fn(*args, emit=job.emit, **kwargs))
+        except Exception as e:
+            print(f"Analysis job {job.id} error: {str(e)}")
+            job._finish('error', error=str(e))
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+@lazy_singleton
+def get_analysis_job_manager():
+    """Shared manager sized by ANALYSIS_WORKERS and ANALYSIS_MAX_PENDING."""
+    return AnalysisJobManager(
+        workers=int(os.getenv("ANALYSIS_WORKERS", "2")),
+        max_pending=int(os.getenv("ANALYSIS_MAX_PENDING", "32")),
+        retention_seconds=int(os.getenv("ANALYSIS_RETENTION_SECONDS", "3600"))
+    )
@@ -1,11 +1,16 @@
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify, send_from_directory
 from flask_cors import CORS
-from qdrant_client import QdrantClient
+from qdrant_pool import get_qdrant_client
+from embedding_service import get_embedding_service
+from job_vectors import query_jobs
+from qdrant_client.http import models
 import os
+import json
 from werkzeug.utils import secure_filename
 from dotenv import load_dotenv
-from pdf_to_json import extract_text_from_pdf, cv_to_json
-from gemini_analyzer import analyze_cv, parse_gemini_output, find_matching_jobs
+from cv_pipeline import run_cv_analysis
+from gemini_analyzer import RESET_SECTION
+from analysis_jobs import get_analysis_job_manager, QueueFullError
 # Import the auth handlers
 from auth import signup_handler, login_handler
 
@@ -15,21 +20,6 @@ CORS(app, resources={r"/api/*": {"origins": "*"}}, supports_credentials=True)
 # Load environment variables
 load_dotenv()
 
-# Get Qdrant configuration
-def get_qdrant_client():
-    qdrant_url = os.getenv("QDRANT_URL")
-    qdrant_api_key = os.getenv("QDRANT_API_KEY")
-    
-    if qdrant_url and qdrant_api_key:
-        # Use cloud Qdrant
-        return QdrantClient(
-            url=qdrant_url,
-            api_key=qdrant_api_key,
-        )
-    else:
-        # Fallback to local Qdrant
-        return QdrantClient("localhost", port=6333)
-
 # Define upload configuration
 UPLOAD_FOLDER = os.path.abspath(os.path.join(os.path.dirname(__file__), 'uploads'))
 ALLOWED_EXTENSIONS = {'pdf', 'doc', 'docx'}
@@ -58,18 +48,63 @@ def login():
 def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
+# Page size bounds for cursor pagination of /api/jobs
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+def parse_cursor(cursor):
+    # Qdrant point ids are either unsigned integers or UUID strings
+    if cursor is None or cursor == '':
+        return None
+    return int(cursor) if cursor.isdigit() else cursor
+
+def build_payload_selector(fields=None, exclude=None):
+    # Let callers trim the payload, e.g. exclude=description
+    if fields:
+        return [f.strip() for f in fields.split(',') if f.strip()]
+    if exclude:
+        return models.PayloadSelectorExclude(
+            exclude=[f.strip() for f in exclude.split(',') if f.strip()]
+        )
+    return True
+
 @app.route('/api/jobs', methods=['GET'])
 def get_jobs():
     try:
         client = get_qdrant_client()
         
-        # Fetch all jobs from Qdrant
-        points = client.scroll(
+        cursor = request.args.get('cursor')
+        limit = request.args.get('limit')
+        fields = request.args.get('fields')
+        exclude = request.args.get('exclude')
+        
+        # Without paging parameters keep the legacy single-blob response
+        if cursor is None and limit is None:
+            points = client.scroll(
+                collection_name="jobs",
+                limit=1000,  # Adjust limit as needed
+                with_payload=build_payload_selector(fields, exclude),
+                with_vectors=False
+            )[0]
+            
+            return jsonify([
+                {
+                    'id': point.id,
+                    'payload': point.payload
+                }
+                for point in points
+            ])
+        
+        page_size = min(max(int(limit or DEFAULT_PAGE_SIZE), 1), MAX_PAGE_SIZE)
+        
+        # Fetch one page and hand Qdrant's cursor back to the caller
+        points, next_page_offset = client.scroll(
             collection_name="jobs",
-            limit=1000,  # Adjust limit as needed
-            with_payload=True,
+            offset=parse_cursor(cursor),
+            limit=page_size,
+            with_payload=build_payload_selector(fields, exclude),
             with_vectors=False
-        )[0]
+        )
         
         # Convert points to JSON-serializable format
         jobs = [
@@ -80,10 +115,104 @@ def get_jobs():
             for point in points
         ]
         
-        return jsonify(jobs)
+        return jsonify({
+            'data': jobs,
+            'limit': page_size,
+            'next_cursor': str(next_page_offset) if next_page_offset is not None else None
+        })
+    except ValueError as e:
+        return jsonify({'error': f'Invalid pagination parameter: {str(e)}'}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+def build_job_filter(location=None, job_type=None):
+    # Push location and job type down to Qdrant as payload conditions
+    conditions = []
+    if location:
+        conditions.append(
+            models.FieldCondition(key="location", match=models.MatchText(text=location))
+        )
+    if job_type:
+        conditions.append(
+            models.FieldCondition(key="type", match=models.MatchText(text=job_type))
+        )
+    return models.Filter(must=conditions) if conditions else None
+
+def semantic_search_jobs(client, query, location, job_type, page, per_page):
+    query_filter = build_job_filter(location, job_type)
+
+    # Embed the query once and let Qdrant rank and paginate, fusing the
+    # title, content and keyword vectors on named-vector collections
+    hits = query_jobs(
+        client,
+        get_embedding_service(),
+        query,
+        query_filter=query_filter,
+        limit=per_page,
+        offset=(page - 1) * per_page
+    )
+
+    # Every point that passes the filter is part of the ranked result set
+    total_results = client.count(
+        collection_name="jobs",
+        count_filter=query_filter,
+        exact=True
+    ).count
+
+    jobs = [
+        {
+            'id': hit.id,
+            'payload': hit.payload,
+            'score': hit.score
+        }
+        for hit in hits
+    ]
+    return jobs, total_results
+
+def keyword_search_jobs(client, query, location, job_type, page, per_page):
+    # Get all jobs first
+    all_jobs = client.scroll(
+        collection_name="jobs",
+        limit=1000,  # Adjust limit as needed
+        with_payload=True,
+        with_vectors=False
+    )[0]
+
+    # Filter jobs based on traditional search criteria
+    filtered_jobs = []
+    for job in all_jobs:
+        job_payload = job.payload
+        job_title = job_payload.get('title', '').lower()
+        job_location = job_payload.get('location', '').lower()
+        job_job_type = job_payload.get('type', '').lower()
+
+        # Check if job matches all provided criteria
+        matches = True
+
+        # Title search
+        if query and query.lower() not in job_title:
+            matches = False
+
+        # Location filter
+        if location and location.lower() not in job_location:
+            matches = False
+
+        # Job type filter
+        if job_type and job_type.lower() != job_job_type.lower():
+            matches = False
+
+        if matches:
+            filtered_jobs.append({
+                'id': job.id,
+                'payload': job_payload
+            })
+
+    # Apply pagination
+    total_results = len(filtered_jobs)
+    start_idx = (page - 1) * per_page
+    end_idx = start_idx + per_page
+    return filtered_jobs[start_idx:end_idx], total_results
+
 @app.route('/api/search-jobs', methods=['POST'])
 def search_jobs():
     try:
@@ -91,55 +220,23 @@ def search_jobs():
         query = search_data.get('query', '')
         location = search_data.get('location')
         job_type = search_data.get('jobType')
-        page = search_data.get('page', 1)
-        per_page = search_data.get('per_page', 1000)
+        mode = search_data.get('mode', 'keyword')
+        page = max(int(search_data.get('page', 1)), 1)
+        per_page = max(int(search_data.get('per_page', 1000)), 1)
 
         # Connect to Qdrant
         client = get_qdrant_client()
-        
-        # Get all jobs first
-        all_jobs = client.scroll(
-            collection_name="jobs",
-            limit=1000,  # Adjust limit as needed
-            with_payload=True,
-            with_vectors=False
-        )[0]
-        
-        # Filter jobs based on traditional search criteria
-        filtered_jobs = []
-        for job in all_jobs:
-            job_payload = job.payload
-            job_title = job_payload.get('title', '').lower()
-            job_location = job_payload.get('location', '').lower()
-            job_job_type = job_payload.get('type', '').lower()
-            
-            # Check if job matches all provided criteria
-            matches = True
-            
-            # Title search
-            if query and query.lower() not in job_title:
-                matches = False
-                
-            # Location filter
-            if location and location.lower() not in job_location:
-                matches = False
-                
-            # Job type filter
-            if job_type and job_type.lower() != job_job_type.lower():
-                matches = False
-                
-            if matches:
-                filtered_jobs.append({
-                    'id': job.id,
-                    'payload': job_payload
-                })
-        
-        # Apply pagination
-        total_results = len(filtered_jobs)
-        start_idx = (page - 1) * per_page
-        end_idx = start_idx + per_page
-        paginated_jobs = filtered_jobs[start_idx:end_idx]
-        
+
+        # Semantic mode needs a query to embed; without one, keep the keyword path
+        if mode == 'semantic' and query:
+            paginated_jobs, total_results = semantic_search_jobs(
+                client, query, location, job_type, page, per_page
+            )
+        else:
+            paginated_jobs, total_results = keyword_search_jobs(
+                client, query, location, job_type, page, per_page
+            )
+
         return jsonify({
             'status': 'success',
             'data': paginated_jobs,
@@ -193,55 +290,102 @@ def upload_cv():
         print(f"Upload error: {str(e)}")
         return jsonify({'error': str(e)}), 500
 
+def resolve_cv_path(data):
+    # Returns (filepath, None) or (None, error response)
+    cv_url = (data or {}).get('cvUrl')
+    if not cv_url:
+        return None, (jsonify({'error': 'CV URL is required'}), 400)
+        
+    # Extract the filename from the URL
+    filename = cv_url.split('/')[-1]
+    filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
+    
+    # Check if file exists
+    if not os.path.exists(filepath):
+        return None, (jsonify({'error': 'CV file not found'}), 404)
+    return filepath, None
+
 @app.route('/api/analyze-cv', methods=['POST'])
 def analyze_cv_endpoint():
     try:
         data = request.json
-        cv_url = data.get('cvUrl')
-        
-        if not cv_url:
-            return jsonify({'error': 'CV URL is required'}), 400
+        filepath, error = resolve_cv_path(data)
+        if error:
+            return error
             
-        # Extract the filename from the URL
-        filename = cv_url.split('/')[-1]
-        filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
+        # Analyse in the request thread and return everything at once
+        return jsonify(run_cv_analysis(
+            filepath,
+            query_filter=build_job_filter(data.get('location'), data.get('jobType'))
+        ))
         
-        # Check if file exists
-        if not os.path.exists(filepath):
-            return jsonify({'error': 'CV file not found'}), 404
+    except Exception as e:
+        print(f"CV Analysis error: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/analyze-cv/jobs', methods=['POST'])
+def submit_cv_analysis():
+    try:
+        data = request.json
+        filepath, error = resolve_cv_path(data)
+        if error:
+            return error
             
-        # Extract text from PDF
-        cv_text = extract_text_from_pdf(filepath)
-        
-        # Convert to JSON format
-        cv_json = cv_to_json(cv_text)
-        
-        # Analyze the CV using Gemini
-        analysis_text = analyze_cv(cv_json)
-        
-        # Parse the analysis into structured data
-        parsed_analysis = parse_gemini_output(analysis_text)
-        
-        # Find matching jobs based on skills and categories
-        matching_jobs = find_matching_jobs(parsed_analysis['skills'], parsed_analysis['categories'])
-        
-        # Return the analysis and job recommendations
-        return jsonify({
-            'skills': parsed_analysis['skills'],
-            'experience': parsed_analysis['experience'],
-            'improvements': parsed_analysis['improvements'],
-            'categories': parsed_analysis['categories'],
-            'score': parsed_analysis['score'],
-            'matchedJobs': len(matching_jobs),
-            'recommendations': matching_jobs
-        })
+        # Queue the analysis on the worker pool and return straight away
+        job = get_analysis_job_manager().submit(
+            run_cv_analysis,
+            filepath,
+            query_filter=build_job_filter(data.get('location'), data.get('jobType'))
+        )
+        return jsonify({'jobId': job.id, 'status': job.status}), 202
         
+    except QueueFullError as e:
+        return jsonify({'error': f"Too many analyses in progress: {str(e)}"}), 503, {'Retry-After': '5'}
     except Exception as e:
-        print(f"CV Analysis error: {str(e)}")
+        print(f"CV Analysis submit error: {str(e)}")
         return jsonify({'error': str(e)}), 500
 
-def allowed_file(filename):
-    return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
+@app.route('/api/analyze-cv/jobs/<job_id>', methods=['GET'])
+def cv_analysis_status(job_id):
+    # Poll for status, the sections parsed so far and the final result
+    job = get_analysis_job_manager().get(job_id)
+    if job is None:
+        return jsonify({'error': 'Analysis job not found'}), 404
+    return jsonify(job.to_dict())
+
+@app.route('/api/analyze-cv/jobs/<job_id>/events', methods=['GET'])
+def cv_analysis_events(job_id):
+    # Server-Sent Events: one "section" event per parsed section, "reset"
+    # when the sections sent so far are superseded, then "done" with the
+    # full result or "error"
+    job = get_analysis_job_manager().get(job_id)
+    if job is None:
+        return jsonify({'error': 'Analysis job not found'}), 404
+        
+    def stream():
+        cursor = 0
+        while True:
+            events, done = job.wait_for_events(cursor)
+            for name, value in events:
+                if name == RESET_SECTION:
+                    yield "event: reset\ndata: {}\n\n"
+                else:
+                    yield f"event: section\ndata: {json.dumps({'name': name, 'value': value})}\n\n"
+            cursor += len(events)
+            if done and cursor >= len(job.events):
+                break
+            if not events:
+                yield ": keep-alive\n\n"
+                
+        if job.status == 'error':
+            yield f"event: error\ndata: {json.dumps({'error': job.error})}\n\n"
+        else:
+            yield f"event: done\ndata: {json.dumps(job.result)}\n\n"
+            
+    return Response(stream(), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
 
 if __name__ == '__main__':
     app.run(debug=True)
\ No newline at end of file
@@ -2,30 +2,14 @@ from flask import Flask, request, jsonify
 from flask_cors import CORS
 import hashlib
 import uuid
-import os
 from dotenv import load_dotenv
-from qdrant_client import QdrantClient
+from qdrant_pool import get_qdrant_client
 from qdrant_client.http import models
 from qdrant_client.http.exceptions import UnexpectedResponse
 
 # Load environment variables
 load_dotenv()
 
-# Get Qdrant configuration
-def get_qdrant_client():
-    qdrant_url = os.getenv("QDRANT_URL")
-    qdrant_api_key = os.getenv("QDRANT_API_KEY")
-    
-    if qdrant_url and qdrant_api_key:
-        # Use cloud Qdrant
-        return QdrantClient(
-            url=qdrant_url,
-            api_key=qdrant_api_key,
-        )
-    else:
-        # Fallback to local Qdrant
-        return QdrantClient("localhost", port=6333)
-
 # Initialize Qdrant client
 qdrant_client = get_qdrant_client()
 
@@ -0,0 +1,99 @@
+"""Compare cold start and encode throughput of the embedding backends.
+
+Each backend runs in a fresh interpreter so the cold-start number
+includes the sentence_transformers/torch import, as it does for the
+scrapers and the API. The embedding cache is disabled for the run.
+
+    python benchmark_embeddings.py
+    python benchmark_embeddings.py --backends torch onnx-int8 --threads 4 --texts 5000
+"""
+import argparse
+import json
+import math
+import os
+import subprocess
+import sys
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+SAMPLE_JOBS = os.path.join(os.path.dirname(BACKEND_DIR), 'scrapers', 'data', 'linkedin_jobs.json')
+
+# Vectors compared against the torch backend
+AGREEMENT_SAMPLE = 100
+
+def load_texts(count):
+    # Job texts in the same shape the processors embed
+    texts = []
+    if os.path.exists(SAMPLE_JOBS):
+        with open(SAMPLE_JOBS, 'r', encoding='utf-8') as f:
+            jobs = json.load(f).get('jobs', [])
+        texts = [f"{job['title']} {job['company']} {job['location']}" for job in jobs]
+    if not texts:
+        texts = [f"Software Engineer {i} Company {i % 37} Colombo" for i in range(count)]
+    # Suffix repeats so every text is distinct and really gets encoded
+    return [f"{texts[i % len(texts)]} #{i}" for i in range(count)]
+
+def run_single(backend, count, batch_size, threads):
+    started = time.perf_counter()
+    from embedding_service import EmbeddingService
+    service = EmbeddingService(backend=backend, threads=threads, cache=None)
+    service.encode(["warm up"])
+    cold_start = time.perf_counter() - started
+
+    texts = load_texts(count)
+    started = time.perf_counter()
+    vectors = service.encode(texts, batch_size=batch_size)
+    elapsed = time.perf_counter() - started
+
+    return {
+        'backend': backend,
+        'cold_start_seconds': round(cold_start, 3),
+        'load_seconds': round(service.load_seconds, 3),
+        'texts_per_second': round(count / elapsed, 1) if elapsed else None,
+        'dimension': len(vectors[0]),
+        'sample': vectors[:AGREEMENT_SAMPLE],
+    }
+
+def cosine(a, b):
+    dot = sum(x * y for x, y in zip(a, b))
+    norm = math.sqrt(sum(x * x for x in a)) * math.sqrt(sum(y * y for y in b))
+    return dot / norm if norm else 0.0
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark embedding backends")
+    parser.add_argument('--backends', nargs='+', default=["torch", "onnx", "onnx-int8"])
+    parser.add_argument('--texts', type=int, default=2000)
+    parser.add_argument('--batch-size', type=int, default=64)
+    parser.add_argument('--threads', type=int, default=None)
+    parser.add_argument('--single', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.single:
+        print(json.dumps(run_single(args.single, args.texts, args.batch_size, args.threads)))
+        return
+
+    env = dict(os.environ, EMBEDDING_CACHE="0")
+    results = []
+    for backend in args.backends:
+        command = [sys.executable, os.path.abspath(__file__), '--single', backend,
+                   '--texts', str(args.texts), '--batch-size', str(args.batch_size)]
+        if args.threads:
+            command += ['--threads', str(args.threads)]
+        proc = subprocess.run(command, cwd=BACKEND_DIR, env=env, capture_output=True, text=True)
+        if proc.returncode != 0:
+            print(f"{backend}: failed\n{proc.stderr.strip()}")
+            continue
+        results.append(json.loads(proc.stdout.strip().splitlines()[-1]))
+
+    reference = next((r for r in results if r['backend'] == "torch"), None)
+    print(f"{'backend':<10} {'cold start':>11} {'model load':>11} {'texts/s':>9} {'dim':>5} {'cos vs torch':>13}")
+    for result in results:
+        agreement = ''
+        if reference and result is not reference:
+            scores = [cosine(a, b) for a, b in zip(result['sample'], reference['sample'])]
+            agreement = f"{min(scores):.4f}"
+        print(f"{result['backend']:<10} {result['cold_start_seconds']:>10.2f}s {result['load_seconds']:>10.2f}s "
+              f"{result['texts_per_second']:>9} {result['dimension']:>5} {agreement:>13}")
+
+if __name__ == "__main__":
+    main()
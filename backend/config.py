@@ -0,0 +1,43 @@
+import os
+import threading
+import functools
+from dotenv import load_dotenv
+
+# Load environment variables from backend/.env, wherever we are imported from
+load_dotenv(os.path.join(os.path.dirname(os.path.abspath(__file__)), '.env'))
+
+TRUE_VALUES = ("1", "true", "yes", "on")
+FALSE_VALUES = ("0", "false", "no", "off")
+
+def env_flag(name, default=False):
+    """Boolean setting: 1/true/yes/on or 0/false/no/off, default when unset or unrecognised."""
+    value = (os.getenv(name) or '').strip().lower()
+    if value in TRUE_VALUES:
+        return True
+    if value in FALSE_VALUES:
+        return False
+    return default
+
+def lazy_singleton(factory):
+    """Turn a factory into a thread-safe getter that builds one shared instance.
+
+    getter.reset() forgets the instance and returns it (or None), so the
+    caller can close it and the next call builds a fresh one.
+    """
+    lock = threading.Lock()
+    instances = []
+
+    @functools.wraps(factory)
+    def get():
+        if not instances:
+            with lock:
+                if not instances:
+                    instances.append(factory())
+        return instances[0]
+
+    def reset():
+        with lock:
+            return instances.pop() if instances else None
+
+    get.reset = reset
+    return get
@@ -0,0 +1,140 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pdf_to_json import extract_text_from_pdf, cv_to_json
+from gemini_analyzer import (
+    analyze_cv_with_source, analyze_cv_streaming, analyze_cv_structured, parse_gemini_output,
+    find_matching_jobs, ANALYSIS_VERSION, GEMINI_OUTPUT_MODE, RESET_SECTION
+)
+from analysis_cache import get_analysis_cache, analysis_cache_key
+from config import env_flag
+
+# Parsed analysis fields, in the order they are reported
+ANALYSIS_SECTIONS = ('skills', 'experience', 'improvements', 'categories', 'score')
+
+# Sections job matching reads
+MATCH_SECTIONS = ('skills', 'categories', 'experience')
+
+# Stream Gemini output and parse it section by section (GEMINI_STREAMING=0
+# waits for the whole response instead)
+GEMINI_STREAMING = env_flag("GEMINI_STREAMING", True)
+
+# Job matching runs here while Gemini is still writing the later sections
+_match_executor = ThreadPoolExecutor(max_workers=int(os.getenv("CV_MATCH_WORKERS", "4")), thread_name_prefix='cv-match')
+
+def _ignore(name, value):
+    pass
+
+def run_cv_analysis(filepath, query_filter=None, emit=None, stream=None):
+    """Analyse a stored CV and recommend jobs for it.
+
+    emit(name, value) is called for every analysis section and for
+    'recommendations' as soon as each is available. When streaming, job
+    matching starts as soon as every section it uses is complete. Returns
+    the /api/analyze-cv response body.
+    """
+    emit = emit or _ignore
+    stream = GEMINI_STREAMING if stream is None else stream
+
+    # Same file bytes with the same prompt and models -> reuse the analysis
+    with open(filepath, 'rb') as f:
+        cache_key = analysis_cache_key(f.read(), ANALYSIS_VERSION)
+    analysis_cache = get_analysis_cache()
+    parsed_analysis = analysis_cache.get(cache_key) if analysis_cache else None
+    cached = parsed_analysis is not None
+
+    # Recommendations are never cached; they follow the current catalogue.
+    # A reset bumps the generation so a stale early match is never emitted
+    match_lock = threading.Lock()
+    generation = 0
+
+    def match(skills, categories, experience, match_generation=None):
+        matching_jobs = find_matching_jobs(
+            skills,
+            categories,
+            summary=' '.join(experience),
+            query_filter=query_filter
+        )
+        with match_lock:
+            if match_generation is None or match_generation == generation:
+                emit('recommendations', matching_jobs)
+        return matching_jobs
+
+    early_match = None
+    early_inputs = None
+
+    if cached:
+        for section in ANALYSIS_SECTIONS:
+            emit(section, parsed_analysis[section])
+    else:
+        # Extract text from PDF
+        cv_text = extract_text_from_pdf(filepath)
+
+        # Convert to JSON format
+        cv_json = cv_to_json(cv_text)
+
+        if GEMINI_OUTPUT_MODE == "json":
+            # One schema-constrained response, validated in a single pass
+            parsed_analysis, source = analyze_cv_structured(cv_json)
+            for section in ANALYSIS_SECTIONS:
+                emit(section, parsed_analysis[section])
+        elif stream:
+            sections = {}
+
+            def on_section(name, value):
+                nonlocal early_match, early_inputs, generation
+                if name == RESET_SECTION:
+                    # The stream failed; its sections are sent again by the
+                    # retry or the fallback
+                    with match_lock:
+                        generation += 1
+                        if early_match is not None:
+                            early_match.cancel()
+                        early_match = early_inputs = None
+                    sections.clear()
+                    emit(name, value)
+                    return
+
+                sections[name] = value
+                emit(name, value)
+                # Match as soon as the sections it uses are final, while
+                # Gemini is still writing the score
+                if early_match is None and all(key in sections for key in MATCH_SECTIONS):
+                    early_inputs = tuple(sections[key] for key in MATCH_SECTIONS)
+                    early_match = _match_executor.submit(match, *early_inputs, match_generation=generation)
+
+            parsed_analysis, source = analyze_cv_streaming(cv_json, on_section)
+        else:
+            # Analyze the CV using Gemini
+            analysis_text, source = analyze_cv_with_source(cv_json)
+
+            # Parse the analysis into structured data
+            parsed_analysis = parse_gemini_output(analysis_text)
+            for section in ANALYSIS_SECTIONS:
+                emit(section, parsed_analysis[section])
+
+        # Fallback output is not cached so the next request retries Gemini
+        if analysis_cache and source == "gemini":
+            analysis_cache.put(cache_key, parsed_analysis)
+
+    # The early match is only used if it ran on the final analysis
+    final_inputs = tuple(parsed_analysis[key] for key in MATCH_SECTIONS)
+    if early_match is not None and early_inputs == final_inputs:
+        matching_jobs = early_match.result()
+    else:
+        if early_match is not None:
+            with match_lock:
+                generation += 1
+                early_match.cancel()
+        matching_jobs = match(*final_inputs)
+
+    return {
+        'skills': parsed_analysis['skills'],
+        'experience': parsed_analysis['experience'],
+        'improvements': parsed_analysis['improvements'],
+        'categories': parsed_analysis['categories'],
+        'score': parsed_analysis['score'],
+        'matchedJobs': len(matching_jobs),
+        'recommendations': matching_jobs,
+        'cached': cached
+    }
@@ -0,0 +1,121 @@
+import os
+import time
+import sqlite3
+import hashlib
+import threading
+from array import array
+from config import env_flag, lazy_singleton
+
+DEFAULT_CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'embedding_cache.sqlite3')
+
+# SQLite caps the number of bound parameters per statement
+_SQL_CHUNK = 500
+
+def cache_key(model_name, text):
+    return hashlib.sha256(f"{model_name}\0{text}".encode('utf-8')).hexdigest()
+
+class EmbeddingCache:
+    """Persistent text -> vector cache shared by the scrapers and the backend.
+
+    Entries are keyed by sha256(model name + text) so switching models
+    never serves stale vectors. Vectors are stored as float32 blobs. When
+    the cache grows past max_entries the least recently used entries are
+    evicted.
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, max_entries=200000):
+        self.path = path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            "key TEXT PRIMARY KEY, vector BLOB NOT NULL, last_used REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS embeddings_last_used ON embeddings (last_used)")
+        self._conn.commit()
+        self._size = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+
+    def get_many(self, model_name, texts):
+        """Return {text: vector} for the texts that are cached."""
+        keys = {cache_key(model_name, text): text for text in dict.fromkeys(texts)}
+        found = {}
+        with self._lock:
+            key_list = list(keys)
+            for start in range(0, len(key_list), _SQL_CHUNK):
+                chunk = key_list[start:start + _SQL_CHUNK]
+                rows = self._conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({','.join('?' * len(chunk))})",
+                    chunk
+                ).fetchall()
+                for key, blob in rows:
+                    vector = array('f')
+                    vector.frombytes(blob)
+                    found[keys[key]] = vector.tolist()
+
+            # Touch the hits so eviction drops the least recently used
+            now = time.time()
+            hit_keys = [cache_key(model_name, text) for text in found]
+            self._conn.executemany(
+                "UPDATE embeddings SET last_used = ? WHERE key = ?",
+                [(now, key) for key in hit_keys]
+            )
+            self._conn.commit()
+
+            self.hits += len(found)
+            self.misses += len(keys) - len(found)
+        return found
+
+    def put_many(self, model_name, items):
+        """Store (text, vector) pairs and evict down to max_entries."""
+        now = time.time()
+        rows = [
+            (cache_key(model_name, text), array('f', vector).tobytes(), now)
+            for text, vector in items
+        ]
+        if not rows:
+            return
+        with self._lock:
+            self._conn.executemany("INSERT OR REPLACE INTO embeddings VALUES (?, ?, ?)", rows)
+            # Replaced rows make this an over-estimate; recount before evicting
+            self._size += len(rows)
+            if self._size > self.max_entries:
+                self._size = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+            if self._size > self.max_entries:
+                self._conn.execute(
+                    "DELETE FROM embeddings WHERE key IN "
+                    "(SELECT key FROM embeddings ORDER BY last_used LIMIT ?)",
+                    (self._size - self.max_entries,)
+                )
+                self._size = self.max_entries
+            self._conn.commit()
+
+    @property
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'entries': self._size,
+        }
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+@lazy_singleton
+def _shared_cache():
+    return EmbeddingCache(
+        path=os.getenv("EMBEDDING_CACHE_PATH", DEFAULT_CACHE_PATH),
+        max_entries=int(os.getenv("EMBEDDING_CACHE_MAX_ENTRIES", "200000"))
+    )
+
+def get_embedding_cache():
+    """Shared cache instance, or None when EMBEDDING_CACHE=0."""
+    return _shared_cache() if env_flag("EMBEDDING_CACHE", True) else None
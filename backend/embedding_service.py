@@ -0,0 +1,131 @@
+import os
+import time
+import logging
+import threading
+from config import lazy_singleton
+from embedding_cache import get_embedding_cache
+
+# The jobs collection stores 384-dim vectors from this model; every
+# backend below must produce vectors in the same space
+EMBEDDING_MODEL_NAME = 'all-MiniLM-L6-v2'
+EMBEDDING_DIM = 384
+
+# torch:     the original PyTorch model
+# onnx:      same weights exported to ONNX Runtime
+# onnx-int8: dynamically quantized ONNX weights (smaller, faster on CPU,
+#            vectors differ very slightly from fp32)
+# The onnx backends need the optional extra: pip install "sentence-transformers[onnx]"
+BACKENDS = ("torch", "onnx", "onnx-int8")
+DEFAULT_ONNX_INT8_FILE = "onnx/model_quint8_avx2.onnx"
+
+logger = logging.getLogger(__name__)
+
+class EmbeddingService:
+    """One lazily loaded sentence embedding model for the whole process.
+
+    The model is only loaded on the first encode call, so importing the
+    scrapers or starting the API does not pay for torch and the weights.
+    Lookups go through the persistent embedding cache when it is enabled.
+    """
+
+    def __init__(self, model_name=EMBEDDING_MODEL_NAME, backend="torch", threads=None, cache=None,
+                 onnx_int8_file=DEFAULT_ONNX_INT8_FILE):
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown embedding backend '{backend}', expected one of {BACKENDS}")
+        self.model_name = model_name
+        self.backend = backend
+        self.threads = threads
+        self.cache = cache
+        self.onnx_int8_file = onnx_int8_file
+        self.load_seconds = None
+
+        # Quantized vectors get their own cache entries; torch and onnx
+        # run the same fp32 weights and can share them
+        self.cache_namespace = f"{model_name}:int8" if backend == "onnx-int8" else model_name
+
+        self._model = None
+        self._lock = threading.Lock()
+
+    def _load(self):
+        started = time.perf_counter()
+        from sentence_transformers import SentenceTransformer
+
+        if self.backend == "torch":
+            if self.threads:
+                import torch
+                torch.set_num_threads(self.threads)
+            model = SentenceTransformer(self.model_name, device="cpu")
+        else:
+            model_kwargs = {"provider": "CPUExecutionProvider"}
+            if self.threads:
+                import onnxruntime
+                session_options = onnxruntime.SessionOptions()
+                session_options.intra_op_num_threads = self.threads
+                model_kwargs["session_options"] = session_options
+            if self.backend == "onnx-int8":
+                model_kwargs["file_name"] = self.onnx_int8_file
+            model = SentenceTransformer(self.model_name, device="cpu", backend="onnx", model_kwargs=model_kwargs)
+
+        dimension = model.get_sentence_embedding_dimension()
+        if dimension != EMBEDDING_DIM:
+            raise ValueError(f"{self.model_name} produces {dimension}-dim vectors, the jobs collection expects {EMBEDDING_DIM}")
+
+        self.load_seconds = time.perf_counter() - started
+        logger.info(f"Loaded {self.model_name} ({self.backend}) in {self.load_seconds:.2f}s")
+        return model
+
+    @property
+    def model(self):
+        if self._model is None:
+            with self._lock:
+                if self._model is None:
+                    self._model = self._load()
+        return self._model
+
+    def _encode_uncached(self, texts, batch_size):
+        return self.model.encode(texts, batch_size=batch_size).tolist()
+
+    def encode(self, texts, batch_size=64):
+        """Embed a list of texts, returning one list of floats per text."""
+        if not texts:
+            return []
+        if self.cache is None:
+            return self._encode_uncached(texts, batch_size)
+
+        cached = self.cache.get_many(self.cache_namespace, texts)
+        missing = [text for text in dict.fromkeys(texts) if text not in cached]
+        if missing:
+            fresh = list(zip(missing, self._encode_uncached(missing, batch_size)))
+            self.cache.put_many(self.cache_namespace, fresh)
+            cached.update(fresh)
+        return [cached[text] for text in texts]
+
+    def encode_one(self, text):
+        return self.encode([text])[0]
+
+    @property
+    def stats(self):
+        stats = {
+            'model': self.model_name,
+            'backend': self.backend,
+            'loaded': self._model is not None,
+            'load_seconds': self.load_seconds,
+        }
+        if self.cache is not None:
+            stats['cache'] = self.cache.stats
+        return stats
+
+@lazy_singleton
+def get_embedding_service():
+    """Process-wide EmbeddingService configured from the environment.
+
+    EMBEDDING_BACKEND picks torch (default), onnx or onnx-int8 and
+    EMBEDDING_THREADS caps the CPU threads used for inference.
+    """
+    threads = os.getenv("EMBEDDING_THREADS")
+    return EmbeddingService(
+        backend=os.getenv("EMBEDDING_BACKEND", "torch").strip().lower(),
+        threads=int(threads) if threads else None,
+        cache=get_embedding_cache(),
+        onnx_int8_file=os.getenv("EMBEDDING_ONNX_INT8_FILE", DEFAULT_ONNX_INT8_FILE)
+    )
@@ -1,10 +1,15 @@
 import google.generativeai as genai
 import os
 import json
-import time
+import re
+import hashlib
 import random
+from dataclasses import dataclass, field
 from dotenv import load_dotenv
-from qdrant_client import QdrantClient
+from qdrant_pool import get_qdrant_client
+from gemini_limiter import get_gemini_limiter, estimate_tokens, SingleFlight
+from embedding_service import get_embedding_service
+from job_vectors import CONTENT_VECTOR, query_jobs
 
 # Load environment variables
 load_dotenv()
@@ -16,32 +21,25 @@ api_key = os.getenv("GEMINI_API_KEY")
 if api_key:
     genai.configure(api_key=api_key)
 
-# Get Qdrant configuration
-def get_qdrant_client():
-    qdrant_url = os.getenv("QDRANT_URL")
-    qdrant_api_key = os.getenv("QDRANT_API_KEY")
-    
-    if qdrant_url and qdrant_api_key:
-        # Use cloud Qdrant
-        return QdrantClient(
-            url=qdrant_url,
-            api_key=qdrant_api_key,
-        )
-    else:
-        # Fallback to local Qdrant
-        return QdrantClient("localhost", port=6333)
-
 AVAILABLE_MODELS = [ "gemini-2.0-flash"]
 
-def analyze_cv(cv_json):
-    """
-    Analyze CV using Gemini API or fallback on quota limit or error.
-    """
-    if not api_key:
-        print("No Gemini API key found. Using fallback analysis.")
-        return fallback_cv_analysis(cv_json)
+# How find_matching_jobs ranks jobs: "vector" (similarity search over the
+# job vectors) or "filter" (payload text filters, unranked)
+CV_MATCH_MODE = os.getenv("CV_MATCH_MODE", "vector")
+
+# Share of the final vector-mode score that comes from skill overlap
+SKILL_OVERLAP_WEIGHT = float(os.getenv("SKILL_OVERLAP_WEIGHT", "0.3"))
+
+# Candidates fetched per requested job when re-ranking by skill overlap
+RERANK_POOL = 3
 
-    prompt = f"""
+# Sent by analyze_cv_streaming when sections already sent are superseded
+RESET_SECTION = 'reset'
+
+# Placeholders parse_gemini_output fills empty sections with
+PLACEHOLDER_VALUES = {'No specific skills detected', 'No experience detected', 'General'}
+
+CV_ANALYSIS_PROMPT = """
     Here's a CV JSON:
     {cv_json}
 
@@ -74,35 +72,344 @@ def analyze_cv(cv_json):
     Format clearly with headers and bullet points.
     """
 
+# Seconds every Gemini call is held back after the API answers 429
+RATE_LIMIT_COOLDOWN_SECONDS = float(os.getenv("GEMINI_429_COOLDOWN_SECONDS", "10"))
+
+# Concurrent requests with the same prompt share one Gemini call
+_gemini_calls = SingleFlight()
+
+# "text" asks for headed bullet lists and parses them; "json" asks for
+# schema-constrained JSON and validates it in one pass
+GEMINI_OUTPUT_MODE = os.getenv("GEMINI_OUTPUT_MODE", "text").strip().lower()
+
+CV_ANALYSIS_JSON_PROMPT = """
+    Here's a CV JSON:
+    {cv_json}
+
+    Analyze this CV. List its technical skills with a 1-5 rating each,
+    its soft skills, years of experience with roles and industry sectors,
+    degrees and certifications, specific suggestions to improve the CV,
+    suggested job categories and 3-5 job titles. Rate the CV out of 100
+    with subscores for skills, experience, education and presentation
+    (0-25 each).
+    """
+
+# Response schema for GEMINI_OUTPUT_MODE=json
+CV_ANALYSIS_SCHEMA = {
+    "type": "OBJECT",
+    "properties": {
+        "technical_skills": {
+            "type": "ARRAY",
+            "items": {
+                "type": "OBJECT",
+                "properties": {
+                    "name": {"type": "STRING"},
+                    "rating": {"type": "INTEGER"},
+                },
+                "required": ["name", "rating"],
+            },
+        },
+        "soft_skills": {"type": "ARRAY", "items": {"type": "STRING"}},
+        "experience": {"type": "ARRAY", "items": {"type": "STRING"}},
+        "education": {"type": "ARRAY", "items": {"type": "STRING"}},
+        "improvements": {"type": "ARRAY", "items": {"type": "STRING"}},
+        "categories": {"type": "ARRAY", "items": {"type": "STRING"}},
+        "job_titles": {"type": "ARRAY", "items": {"type": "STRING"}},
+        "score": {"type": "INTEGER"},
+        "subscores": {
+            "type": "OBJECT",
+            "properties": {
+                "skills": {"type": "INTEGER"},
+                "experience": {"type": "INTEGER"},
+                "education": {"type": "INTEGER"},
+                "presentation": {"type": "INTEGER"},
+            },
+            "required": ["skills", "experience", "education", "presentation"],
+        },
+    },
+    "required": [
+        "technical_skills", "soft_skills", "experience", "education",
+        "improvements", "categories", "job_titles", "score", "subscores",
+    ],
+}
+
+# Changes whenever the prompts, the output mode or the model list do, so
+# cached analyses from an older prompt are never served
+ANALYSIS_VERSION = hashlib.sha256(
+    '|'.join([CV_ANALYSIS_PROMPT, CV_ANALYSIS_JSON_PROMPT, GEMINI_OUTPUT_MODE] + AVAILABLE_MODELS).encode('utf-8')
+).hexdigest()[:16]
+
+class AnalysisValidationError(ValueError):
+    pass
+
+@dataclass
+class CVAnalysis:
+    """A schema-validated Gemini analysis (GEMINI_OUTPUT_MODE=json)."""
+    technical_skills: list = field(default_factory=list)
+    soft_skills: list = field(default_factory=list)
+    experience: list = field(default_factory=list)
+    education: list = field(default_factory=list)
+    improvements: list = field(default_factory=list)
+    categories: list = field(default_factory=list)
+    job_titles: list = field(default_factory=list)
+    score: int = 0
+    subscores: dict = field(default_factory=dict)
+    issues: list = field(default_factory=list)
+
+    def to_parsed(self):
+        """Same shape as parse_gemini_output, with the same placeholders."""
+        return {
+            'skills': [skill['name'] for skill in self.technical_skills] + self.soft_skills
+                      or ['No specific skills detected'],
+            'experience': self.experience or ['No experience detected'],
+            'improvements': self.improvements or ['Add more details to your CV'],
+            'categories': self.categories + self.job_titles or ['General'],
+            'score': self.score
+        }
+
+def _bounded_int(value, low, high):
+    # Clamp into range; None when the value is not a number at all
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    elif isinstance(value, str) and value.strip().isdigit():
+        value = int(value.strip())
+    if not isinstance(value, int):
+        return None
+    return min(max(value, low), high)
+
+def _string_list(data, name, issues):
+    value = data.get(name, [])
+    if not isinstance(value, list):
+        issues.append(f"'{name}' is not a list")
+        return []
+    strings = [item.strip() for item in value if isinstance(item, str) and item.strip()]
+    if len(strings) < len(value):
+        issues.append(f"dropped {len(value) - len(strings)} empty or non-string '{name}' items")
+    return strings
+
+def validate_analysis(data):
+    """
+    Validate decoded JSON against CV_ANALYSIS_SCHEMA. Out-of-range numbers
+    are clamped and unusable values dropped, so one bad field does not
+    cost the rest; each correction is listed in CVAnalysis.issues. Raises
+    AnalysisValidationError only when there is nothing usable.
+    """
+    if not isinstance(data, dict):
+        raise AnalysisValidationError("analysis must be a JSON object")
+    missing = [key for key in CV_ANALYSIS_SCHEMA["required"] if key not in data]
+    if len(missing) == len(CV_ANALYSIS_SCHEMA["required"]):
+        raise AnalysisValidationError("none of the analysis fields are present")
+    issues = [f"missing fields: {', '.join(missing)}"] if missing else []
+
+    technical_skills = []
+    skills = data.get('technical_skills', [])
+    if not isinstance(skills, list):
+        issues.append("'technical_skills' is not a list")
+        skills = []
+    for skill in skills:
+        if not isinstance(skill, dict) or not isinstance(skill.get('name'), str) or not skill['name'].strip():
+            issues.append(f"dropped technical skill {skill!r}")
+            continue
+        rating = _bounded_int(skill.get('rating'), 1, 5)
+        if rating != skill.get('rating'):
+            issues.append(f"rating of {skill['name'].strip()!r} was {skill.get('rating')!r}")
+        technical_skills.append({'name': skill['name'].strip(), 'rating': rating})
+
+    subscores = {}
+    raw_subscores = data.get('subscores', {})
+    if not isinstance(raw_subscores, dict):
+        issues.append("'subscores' is not an object")
+        raw_subscores = {}
+    for key in ('skills', 'experience', 'education', 'presentation'):
+        value = _bounded_int(raw_subscores.get(key), 0, 25)
+        if value != raw_subscores.get(key):
+            issues.append(f"subscores.{key} was {raw_subscores.get(key)!r}")
+        if value is not None:
+            subscores[key] = value
+
+    score = _bounded_int(data.get('score'), 0, 100)
+    if score != data.get('score'):
+        issues.append(f"score was {data.get('score')!r}")
+    if score is None:
+        # Same default as parse_gemini_output, unless the subscores add up
+        score = sum(subscores.values()) if len(subscores) == 4 else 70
+
+    return CVAnalysis(
+        technical_skills=technical_skills,
+        soft_skills=_string_list(data, 'soft_skills', issues),
+        experience=_string_list(data, 'experience', issues),
+        education=_string_list(data, 'education', issues),
+        improvements=_string_list(data, 'improvements', issues),
+        categories=_string_list(data, 'categories', issues),
+        job_titles=_string_list(data, 'job_titles', issues),
+        score=score,
+        subscores=subscores,
+        issues=issues
+    )
+
+def analyze_cv(cv_json):
+    """
+    Analyze CV using Gemini API or fallback on quota limit or error.
+    """
+    return analyze_cv_with_source(cv_json)[0]
+
+def _call_gemini(prompt, handle_response, stream=False, generation_config=None):
+    """
+    Run prompt against AVAILABLE_MODELS within the shared rate limit.
+    handle_response turns the SDK response into the caller's result; it
+    runs inside the try so errors while streaming are handled too.
+    Returns (result, True) on success or (None, False) when the budget is
+    exhausted, Gemini answered 429 or every model failed, so callers can
+    degrade to fallback_cv_analysis without sleeping.
+    """
+    limiter = get_gemini_limiter()
+    tokens = estimate_tokens(prompt)
+
     for model_name in AVAILABLE_MODELS:
-        retry_count = 0
-        max_retries = 3
-
-        while retry_count < max_retries:
-            try:
-                model = genai.GenerativeModel(model_name=model_name)
-                response = model.generate_content(prompt)
-                print(f"Success with model: {model_name}")
-                return response.text
-
-            except Exception as e:
-                error_message = str(e)
-                print(f"Model {model_name} error: {error_message}")
-
-                if "429" in error_message:
-                    # Rate limit exceeded
-                    retry_seconds = 10 * (2 ** retry_count) + random.uniform(0, 3)
-                    print(f"Rate limit exceeded on {model_name}. Retrying in {retry_seconds:.2f} seconds...")
-                    time.sleep(retry_seconds)
-                    retry_count += 1
-                else:
-                    # Any other error, break and try next model
-                    print(f"Switching model due to error: {model_name}")
-                    break
+        if not limiter.acquire(tokens):
+            print(f"Gemini budget exhausted, not calling {model_name}")
+            return None, False
+
+        try:
+            model = genai.GenerativeModel(model_name=model_name)
+            response = model.generate_content(prompt, stream=stream, generation_config=generation_config)
+            result = handle_response(response)
+            print(f"Success with model: {model_name}")
+            return result, True
+
+        except Exception as e:
+            error_message = str(e)
+            print(f"Model {model_name} error: {error_message}")
+
+            if "429" in error_message:
+                # Rate limit exceeded: hold back every caller for a while
+                # instead of sleeping in this request thread
+                cooldown = RATE_LIMIT_COOLDOWN_SECONDS + random.uniform(0, 3)
+                print(f"Rate limit exceeded on {model_name}. Pausing Gemini calls for {cooldown:.2f} seconds")
+                limiter.penalize(cooldown)
+                return None, False
+
+            # Any other error, try next model
+            print(f"Switching model due to error: {model_name}")
+
+    return None, False
+
+def analyze_cv_with_source(cv_json):
+    """
+    Like analyze_cv, but returns (analysis_text, source) where source is
+    "gemini" or "fallback", so callers can avoid caching fallback output.
+    """
+    if not api_key:
+        print("No Gemini API key found. Using fallback analysis.")
+        return fallback_cv_analysis(cv_json), "fallback"
+
+    prompt = CV_ANALYSIS_PROMPT.format(cv_json=cv_json)
+    (text, ok), _ = _gemini_calls.do(("text", prompt), lambda: _call_gemini(prompt, lambda response: response.text))
+    if ok:
+        return text, "gemini"
 
     # If all models fail
     print("All Gemini models failed or quota exceeded. Using fallback.")
-    return fallback_cv_analysis(cv_json)
+    return fallback_cv_analysis(cv_json), "fallback"
+
+def analyze_cv_structured(cv_json):
+    """
+    Ask Gemini for schema-constrained JSON and validate it in one pass.
+    Returns (parsed_results, source) like analyze_cv_streaming. JSON that
+    cannot be used at all degrades to fallback_cv_analysis instead of a
+    second Gemini call.
+    """
+    if not api_key:
+        print("No Gemini API key found. Using fallback analysis.")
+        return parse_gemini_output(fallback_cv_analysis(cv_json)), "fallback"
+
+    def validate(response):
+        try:
+            return validate_analysis(json.loads(response.text)), None
+        except ValueError as e:
+            return None, str(e)
+
+    prompt = CV_ANALYSIS_JSON_PROMPT.format(cv_json=cv_json)
+    (result, ok), _ = _gemini_calls.do(("json", prompt), lambda: _call_gemini(
+        prompt,
+        validate,
+        generation_config=genai.GenerationConfig(
+            response_mime_type="application/json",
+            response_schema=CV_ANALYSIS_SCHEMA
+        )
+    ))
+    if ok:
+        analysis, error = result
+        if analysis is not None:
+            if analysis.issues:
+                print(f"Structured analysis corrected: {'; '.join(analysis.issues)}")
+            return analysis.to_parsed(), "gemini"
+        print(f"Structured analysis failed validation ({error}). Using fallback.")
+    else:
+        print("All Gemini models failed or quota exceeded. Using fallback.")
+    return parse_gemini_output(fallback_cv_analysis(cv_json)), "fallback"
+
+def analyze_cv_streaming(cv_json, on_section=None):
+    """
+    Streaming variant of analyze_cv_with_source. Sections are parsed while
+    Gemini is still generating and on_section(name, value) is called as
+    soon as each one is complete. If a stream fails after sending sections,
+    on_section(RESET_SECTION, None) is called before the retry or the
+    fallback sends them again. Returns (parsed_results, source), where
+    parsed_results has the shape of parse_gemini_output.
+    """
+    on_section = on_section or (lambda name, value: None)
+    sent = False
+
+    def send(name, value):
+        nonlocal sent
+        sent = True
+        on_section(name, value)
+
+    def restart():
+        # Sections of a failed attempt are already out; have the caller drop them
+        nonlocal sent
+        if sent:
+            on_section(RESET_SECTION, None)
+            sent = False
+
+    def parse_text(text):
+        restart()
+        parser = IncrementalAnalysisParser()
+        for name, value in parser.feed(text):
+            send(name, value)
+        for name, value in parser.close():
+            send(name, value)
+        return parser.results
+
+    if not api_key:
+        print("No Gemini API key found. Using fallback analysis.")
+        return parse_text(fallback_cv_analysis(cv_json)), "fallback"
+
+    def consume(response):
+        # A fresh parser per attempt; a retried stream re-sends its sections
+        restart()
+        parser = IncrementalAnalysisParser()
+        for chunk in response:
+            for name, value in parser.feed(chunk.text):
+                send(name, value)
+        for name, value in parser.close():
+            send(name, value)
+        return parser.results
+
+    prompt = CV_ANALYSIS_PROMPT.format(cv_json=cv_json)
+    (results, ok), shared = _gemini_calls.do(("stream", prompt), lambda: _call_gemini(prompt, consume, stream=True))
+    if ok:
+        if shared:
+            # Another request streamed this prompt; replay its sections
+            for name, value in results.items():
+                send(name, value)
+        return results, "gemini"
+
+    print("All Gemini models failed or quota exceeded. Using fallback.")
+    return parse_text(fallback_cv_analysis(cv_json)), "fallback"
 
 def fallback_cv_analysis(cv_json):
     try:
@@ -187,60 +494,13 @@ def fallback_cv_analysis(cv_json):
 def parse_gemini_output(analysis_text):
     """Parse Gemini API output into structured fields."""
     try:
-        # Split into sections more reliably
-        sections = analysis_text.split('\n\n')
-        results = {
-            'skills': [],
-            'experience': [],
-            'improvements': [],
-            'categories': [],
-            'score': 70
-        }
-        
-        current_section = None
-        for section in sections:
-            section = section.strip()
-            
-            # More robust section detection
-            if 'Technical Skills:' in section or 'Skills:' in section:
-                skills = [s.strip('- ').strip() for s in section.split('\n')[1:]]
-                results['skills'].extend([s for s in skills if s and not s.startswith('skill')])
-            elif 'Soft Skills:' in section:
-                skills = [s.strip('- ').strip() for s in section.split('\n')[1:]]
-                results['skills'].extend([s for s in skills if s and not s.startswith('skill')])
-            elif 'Experience:' in section:
-                exp = [e.strip('- ').strip() for e in section.split('\n')[1:]]
-                results['experience'].extend([e for e in exp if e and not e.startswith('experience')])
-            elif 'Improvements:' in section or 'Improvement:' in section:
-                imp = [i.strip('- ').strip() for i in section.split('\n')[1:]]
-                results['improvements'].extend([i for i in imp if i and not i.startswith('improve')])
-            elif 'Categories:' in section or 'Category:' in section:
-                cat = [c.strip('- ').strip() for c in section.split('\n')[1:]]
-                results['categories'].extend([c for c in cat if c and not c.startswith('categor')])
-            elif 'Score:' in section:
-                score_line = [line for line in section.split('\n') if 'Score:' in line]
-                if score_line:
-                    score_text = score_line[0]
-                    score = ''.join(filter(str.isdigit, score_text))
-                    if score:
-                        results['score'] = min(max(int(score[:3]), 0), 100)
-
-        # Clean up and ensure no empty lists
-        for key in results:
-            if isinstance(results[key], list):
-                results[key] = [item for item in results[key] if item]
-                if not results[key]:
-                    if key == 'skills':
-                        results[key] = ['No specific skills detected']
-                    elif key == 'experience':
-                        results[key] = ['No experience detected']
-                    elif key == 'improvements':
-                        results[key] = ['Add more details to your CV']
-                    elif key == 'categories':
-                        results[key] = ['General']
-                        
-        return results
-        
+        # The whole response in one go through the streaming parser, so
+        # buffered and streamed analyses always agree
+        parser = IncrementalAnalysisParser()
+        parser.feed(analysis_text)
+        parser.close()
+        return parser.results
+
     except Exception as e:
         print(f"Parse error: {str(e)}")
         return {
@@ -251,8 +511,158 @@ def parse_gemini_output(analysis_text):
             'score': 50
         }
 
-# Add this function definition before the example usage at the bottom
-def find_matching_jobs(skills, categories, top_k=10):
+# Values parse_gemini_output uses for a section with no items
+SECTION_PLACEHOLDERS = {
+    'skills': 'No specific skills detected',
+    'experience': 'No experience detected',
+    'improvements': 'Add more details to your CV',
+    'categories': 'General',
+}
+
+# Headers of the analysis prompt and the result field each one feeds;
+# None marks sections that are read past but not reported
+SECTION_HEADERS = {
+    'technical skills': 'skills',
+    'soft skills': 'skills',
+    'skills': 'skills',
+    'experience': 'experience',
+    'education': None,
+    'improvements': 'improvements',
+    'improvement': 'improvements',
+    'categories': 'categories',
+    'category': 'categories',
+    'score': 'score',
+}
+
+# Keywords that identify reworded "Header:" lines such as "Work
+# Experience:" or "Areas for Improvement:"; the one found last wins
+HEADER_KEYWORDS = (
+    ('skill', 'skills'),
+    ('experience', 'experience'),
+    ('education', None),
+    ('improvement', 'improvements'),
+    ('categor', 'categories'),
+    ('job title', 'categories'),
+    ('score', 'score'),
+)
+
+# A header alone on its line ("Technical Skills:") or followed by its
+# first value ("Score: 78/100"), optionally numbered
+_HEADER_RE = re.compile(r"^(?:\d+\.\s*)?([A-Za-z ]+?)\s*(?::\s*(.*))?$")
+
+# Returned by _header_section for lines that are not headers
+_NOT_A_HEADER = object()
+
+def _header_section(name, value):
+    """Result field a header line opens, None for a section that is not reported."""
+    if name in SECTION_HEADERS:
+        return SECTION_HEADERS[name]
+    if value is None:
+        # Without a colon only the exact prompt headers count
+        return _NOT_A_HEADER
+
+    section, position = _NOT_A_HEADER, -1
+    for keyword, key in HEADER_KEYWORDS:
+        found = name.rfind(keyword)
+        if found > position:
+            section, position = key, found
+    if section is _NOT_A_HEADER and not value:
+        # Any other "Xxx:" line starts a section we do not report
+        return None
+    return section
+
+# Markdown emphasis and heading marks around a line
+_EMPHASIS_RE = re.compile(r"\*\*|__")
+
+class IncrementalAnalysisParser:
+    """
+    Line-based parser for a streamed analysis. feed() takes text chunks
+    as they arrive and returns the (name, value) sections completed by
+    them; a section is complete once the next header starts. close()
+    returns the rest, including placeholders for sections that never
+    appeared. results ends up with the same shape as parse_gemini_output.
+    """
+
+    def __init__(self):
+        self.results = {
+            'skills': [],
+            'experience': [],
+            'improvements': [],
+            'categories': [],
+            'score': 70
+        }
+        self._buffer = ''
+        self._current = None
+        self._score_lines = []
+        self._emitted = set()
+
+    def feed(self, text):
+        self._buffer += text or ''
+        *lines, self._buffer = self._buffer.split('\n')
+        completed = []
+        for line in lines:
+            completed.extend(self._line(line))
+        return completed
+
+    def close(self):
+        completed = []
+        if self._buffer:
+            completed.extend(self._line(self._buffer))
+            self._buffer = ''
+        completed.extend(self._complete(self._current))
+        self._current = None
+        for key in self.results:
+            completed.extend(self._complete(key))
+        return completed
+
+    def _line(self, line):
+        text = _EMPHASIS_RE.sub('', line).strip().strip('#').strip()
+        header = _HEADER_RE.match(text)
+        key = _header_section(header.group(1).strip().lower(), header.group(2)) if header else _NOT_A_HEADER
+        if key is not _NOT_A_HEADER:
+            value = (header.group(2) or '').strip()
+            if self._current == 'score' and (value or key is None):
+                # "Skills: 20/25" or "Breakdown:" under Score belong to the
+                # score, they do not start a new section
+                return self._item(text)
+            completed = []
+            if key != self._current:
+                # Technical Skills followed by Soft Skills stay one section
+                completed = self._complete(self._current)
+                self._current = key
+            if value:
+                self._item(value)
+            return completed
+
+        return self._item(text)
+
+    def _item(self, text):
+        if self._current is None or not text:
+            return []
+        if self._current == 'score':
+            self._score_lines.append(text)
+            return []
+
+        item = text.lstrip('-*•').strip()
+        if item and item not in self.results[self._current]:
+            self.results[self._current].append(item)
+        return []
+
+    def _complete(self, key):
+        if key is None or key in self._emitted:
+            return []
+        self._emitted.add(key)
+
+        if key == 'score':
+            score_text = ' '.join(self._score_lines)
+            match = re.search(r"(\d{1,3})\s*/\s*100", score_text) or re.search(r"\b(\d{1,3})\b", score_text)
+            if match:
+                self.results['score'] = min(max(int(match.group(1)), 0), 100)
+        elif not self.results[key]:
+            self.results[key] = [SECTION_PLACEHOLDERS[key]]
+        return [(key, self.results[key])]
+
+def filter_matching_jobs(skills, categories, top_k=10):
     try:
         client = get_qdrant_client()
         
@@ -329,7 +739,91 @@ def find_matching_jobs(skills, categories, top_k=10):
         print(f"Job matching error: {str(e)}")
         return []
 
-skills = ["Python", "Machine Learning"]
-categories = ["Technology"]
-matching_jobs = find_matching_jobs(skills, categories)  # Remove threshold parameter
-print(matching_jobs)
+def _clean_terms(values):
+    # Drop placeholders and trailing ratings such as "Python (5/5)" or "SQL - 4"
+    terms = []
+    for value in values or []:
+        value = re.sub(r"\s*\(.*?\)\s*$", "", value.strip())
+        value = re.sub(r"\s*[:\-–]\s*\d.*$", "", value).strip('* ')
+        if value and value not in PLACEHOLDER_VALUES and value not in terms:
+            terms.append(value)
+    return terms
+
+def skill_overlap(skills, payload):
+    """Fraction of the CV skills mentioned in a job's title, skills or description."""
+    if not skills:
+        return 0.0
+    job_skills = payload.get('skills') or ''
+    if isinstance(job_skills, (list, tuple)):
+        job_skills = ' '.join(str(skill) for skill in job_skills)
+    text = ' '.join([payload.get('title') or '', job_skills, payload.get('description') or '']).lower()
+    matched = sum(
+        1 for skill in skills
+        if re.search(r"(?<![\w+#])" + re.escape(skill.lower()) + r"(?![\w+#])", text)
+    )
+    return matched / len(skills)
+
+def vector_matching_jobs(skills, categories, top_k=10, summary=None, query_filter=None, score_threshold=None,
+                         rerank=True):
+    """Rank jobs by similarity between the CV profile and the job content vectors.
+
+    Skills, categories and summary are embedded as one query, so the cost
+    is a single ANN search however many skills the CV lists. score is the
+    cosine similarity, blended with skill overlap when rerank is on.
+    """
+    skills = _clean_terms(skills)
+    categories = _clean_terms(categories)
+
+    parts = []
+    if summary and summary not in PLACEHOLDER_VALUES:
+        parts.append(summary)
+    if categories:
+        parts.append("Roles: " + ", ".join(categories))
+    if skills:
+        parts.append("Skills: " + ", ".join(skills))
+    if not parts:
+        return []
+
+    rerank = rerank and bool(skills) and SKILL_OVERLAP_WEIGHT > 0
+    hits = query_jobs(
+        get_qdrant_client(),
+        get_embedding_service(),
+        "\n".join(parts),
+        query_filter=query_filter,
+        limit=top_k * RERANK_POOL if rerank else top_k,
+        using=CONTENT_VECTOR,
+        score_threshold=score_threshold
+    )
+
+    matching_jobs = []
+    for hit in hits:
+        payload = hit.payload or {}
+        overlap = skill_overlap(skills, payload)
+        score = (1 - SKILL_OVERLAP_WEIGHT) * hit.score + SKILL_OVERLAP_WEIGHT * overlap if rerank else hit.score
+        matching_jobs.append({
+            'id': hit.id,
+            'payload': payload,
+            'score': score,
+            'similarity': hit.score,
+            'skillOverlap': overlap
+        })
+
+    matching_jobs.sort(key=lambda job: job['score'], reverse=True)
+    return matching_jobs[:top_k]
+
+def find_matching_jobs(skills, categories, top_k=10, mode=None, summary=None, query_filter=None,
+                       score_threshold=None):
+    mode = mode or CV_MATCH_MODE
+    if mode == "vector":
+        try:
+            return vector_matching_jobs(skills, categories, top_k, summary, query_filter, score_threshold)
+        except Exception as e:
+            print(f"Vector job matching error, falling back to filters: {str(e)}")
+    return filter_matching_jobs(skills, categories, top_k)
+
+if __name__ == "__main__":
+    skills = ["Python", "Machine Learning"]
+    categories = ["Technology"]
+    matching_jobs = find_matching_jobs(skills, categories)
+    print(matching_jobs)
+
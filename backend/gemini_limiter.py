@@ -0,0 +1,121 @@
+import os
+import time
+import threading
+from concurrent.futures import Future
+from config import lazy_singleton
+
+# Rough prompt size in tokens, plus what a CV analysis answer usually takes
+CHARS_PER_TOKEN = 4
+EXPECTED_OUTPUT_TOKENS = int(os.getenv("GEMINI_EXPECTED_OUTPUT_TOKENS", "1024"))
+
+def estimate_tokens(prompt):
+    return len(prompt) // CHARS_PER_TOKEN + EXPECTED_OUTPUT_TOKENS
+
+class GeminiRateLimiter:
+    """Process-wide token buckets for Gemini requests per minute and tokens per minute.
+
+    acquire() waits in a bounded queue until both buckets can cover the
+    call, but never longer than max_wait seconds; it returns False
+    instead so the caller can degrade right away. After a 429 from the
+    API, penalize() closes the limiter for a cool-down period.
+    """
+
+    def __init__(self, rpm=15, tpm=1000000, max_wait=2.0, max_queue=16):
+        self.rpm = rpm
+        self.tpm = tpm
+        self.max_wait = max_wait
+        self.max_queue = max_queue
+
+        self._requests = float(rpm)
+        self._tokens = float(tpm)
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+        self._waiting = 0
+        self._condition = threading.Condition()
+        self.stats = {'granted': 0, 'rejected': 0, 'penalties': 0}
+
+    def _refill(self, now):
+        elapsed = now - self._updated
+        self._requests = min(self.rpm, self._requests + elapsed * self.rpm / 60.0)
+        self._tokens = min(self.tpm, self._tokens + elapsed * self.tpm / 60.0)
+        self._updated = now
+
+    def _seconds_until_available(self, tokens, now):
+        # Time until both buckets hold enough for this call
+        waits = [self._blocked_until - now]
+        if self._requests < 1:
+            waits.append((1 - self._requests) * 60.0 / self.rpm)
+        if self._tokens < tokens:
+            waits.append((tokens - self._tokens) * 60.0 / self.tpm)
+        return max(waits + [0.0])
+
+    def acquire(self, tokens, max_wait=None):
+        tokens = min(tokens, self.tpm)
+        deadline = time.monotonic() + (self.max_wait if max_wait is None else max_wait)
+
+        with self._condition:
+            if self._waiting >= self.max_queue:
+                self.stats['rejected'] += 1
+                return False
+            self._waiting += 1
+            try:
+                while True:
+                    now = time.monotonic()
+                    self._refill(now)
+                    wait = self._seconds_until_available(tokens, now)
+                    if wait <= 0:
+                        self._requests -= 1
+                        self._tokens -= tokens
+                        self.stats['granted'] += 1
+                        return True
+                    if now + wait > deadline:
+                        # The budget will not be back before the deadline
+                        self.stats['rejected'] += 1
+                        return False
+                    self._condition.wait(wait)
+            finally:
+                self._waiting -= 1
+
+    def penalize(self, seconds):
+        with self._condition:
+            self._blocked_until = max(self._blocked_until, time.monotonic() + seconds)
+            self.stats['penalties'] += 1
+
+class SingleFlight:
+    """Coalesces concurrent calls with the same key into one execution."""
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, fn):
+        """Return (result, shared); shared is True when another caller's result was reused."""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = Future()
+
+        if not leader:
+            return call.result(), True
+
+        try:
+            result = fn()
+            call.set_result(result)
+            return result, False
+        except BaseException as e:
+            call.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+
+@lazy_singleton
+def get_gemini_limiter():
+    """Shared limiter configured by GEMINI_RPM, GEMINI_TPM, GEMINI_MAX_WAIT_SECONDS and GEMINI_MAX_QUEUE."""
+    return GeminiRateLimiter(
+        rpm=int(os.getenv("GEMINI_RPM", "15")),
+        tpm=int(os.getenv("GEMINI_TPM", "1000000")),
+        max_wait=float(os.getenv("GEMINI_MAX_WAIT_SECONDS", "2")),
+        max_queue=int(os.getenv("GEMINI_MAX_QUEUE", "16"))
+    )
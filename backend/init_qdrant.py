@@ -1,25 +1,13 @@
-from qdrant_client import QdrantClient
-from qdrant_client.models import Distance, VectorParams
-import os
+from qdrant_pool import get_qdrant_client
+from job_vectors import dense_vectors_config, sparse_vectors_config
 from dotenv import load_dotenv
 
 # Load environment variables
 load_dotenv()
 
-# Get Qdrant configuration
-def get_qdrant_client():
-    qdrant_url = os.getenv("QDRANT_URL")
-    qdrant_api_key = os.getenv("QDRANT_API_KEY")
-    
-    if qdrant_url and qdrant_api_key:
-        # Use cloud Qdrant
-        return QdrantClient(
-            url=qdrant_url,
-            api_key=qdrant_api_key,
-        )
-    else:
-        # Fallback to local Qdrant
-        return QdrantClient("localhost", port=6333)
+# Full-text indexed payload fields. location and type back the payload
+# filters of the semantic search in app.py.
+TEXT_INDEX_FIELDS = ["title", "skills", "category", "location", "type"]
 
 def init_qdrant():
     try:
@@ -30,69 +18,36 @@ def init_qdrant():
         if not any(c.name == "jobs" for c in collections):
             client.create_collection(
                 collection_name="jobs",
-                vectors_config=VectorParams(size=384, distance=Distance.COSINE)
+                vectors_config=dense_vectors_config(),
+                sparse_vectors_config=sparse_vectors_config()
             )
             print("Jobs collection created successfully")
             
             # Create text indexes for filtering
-            client.create_payload_index(
-                collection_name="jobs",
-                field_name="title",
-                field_schema="text"
-            )
-            client.create_payload_index(
-                collection_name="jobs",
-                field_name="skills",
-                field_schema="text"
-            )
-            client.create_payload_index(
-                collection_name="jobs",
-                field_name="category",
-                field_schema="text"
-            )
-            print("Created text indexes for title, skills, and category fields")
-        else:
-            print("Jobs collection already exists")
-            
-            # Try to create indexes if they don't exist
-            try:
-                client.create_payload_index(
-                    collection_name="jobs",
-                    field_name="title",
-                    field_schema="text"
-                )
-                print("Created text index for title field")
-            except Exception as e:
-                if "already exists" in str(e):
-                    print("Title index already exists")
-                else:
-                    print(f"Error creating title index: {str(e)}")
-                    
-            try:
+            for field_name in TEXT_INDEX_FIELDS:
                 client.create_payload_index(
                     collection_name="jobs",
-                    field_name="skills",
+                    field_name=field_name,
                     field_schema="text"
                 )
-                print("Created text index for skills field")
-            except Exception as e:
-                if "already exists" in str(e):
-                    print("Skills index already exists")
-                else:
-                    print(f"Error creating skills index: {str(e)}")
-                    
-            try:
-                client.create_payload_index(
-                    collection_name="jobs",
-                    field_name="category",
-                    field_schema="text"
-                )
-                print("Created text index for category field")
-            except Exception as e:
-                if "already exists" in str(e):
-                    print("Category index already exists")
-                else:
-                    print(f"Error creating category index: {str(e)}")
+            print(f"Created text indexes for {', '.join(TEXT_INDEX_FIELDS)} fields")
+        else:
+            print("Jobs collection already exists")
+            
+            # Try to create indexes if they don't exist
+            for field_name in TEXT_INDEX_FIELDS:
+                try:
+                    client.create_payload_index(
+                        collection_name="jobs",
+                        field_name=field_name,
+                        field_schema="text"
+                    )
+                    print(f"Created text index for {field_name} field")
+                except Exception as e:
+                    if "already exists" in str(e):
+                        print(f"{field_name.capitalize()} index already exists")
+                    else:
+                        print(f"Error creating {field_name} index: {str(e)}")
             
     except Exception as e:
         print(f"Error initializing Qdrant: {str(e)}")
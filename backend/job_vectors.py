@@ -0,0 +1,174 @@
+import re
+import math
+import hashlib
+from qdrant_client.http import models
+from embedding_service import EMBEDDING_DIM
+
+# Named vectors of the jobs collection:
+#   title:    title, company and location (the original single vector)
+#   content:  mean of the chunked title + skills + description text
+#   keywords: sparse term-frequency vector, weighted by IDF in Qdrant
+TITLE_VECTOR = "title"
+CONTENT_VECTOR = "content"
+KEYWORD_VECTOR = "keywords"
+
+# Collections created before named vectors hold one unnamed vector
+LAYOUT_SINGLE = "single"
+LAYOUT_NAMED = "named"
+
+# Description chunking, in words. all-MiniLM-L6-v2 truncates input at
+# 256 word pieces, so longer descriptions are embedded piece by piece
+CHUNK_WORDS = 150
+CHUNK_OVERLAP = 30
+MAX_CHUNKS = 8
+
+_TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9+#.]*")
+
+_layouts = {}
+
+def dense_vectors_config():
+    return {
+        TITLE_VECTOR: models.VectorParams(size=EMBEDDING_DIM, distance=models.Distance.COSINE),
+        CONTENT_VECTOR: models.VectorParams(size=EMBEDDING_DIM, distance=models.Distance.COSINE),
+    }
+
+def sparse_vectors_config():
+    return {KEYWORD_VECTOR: models.SparseVectorParams(modifier=models.Modifier.IDF)}
+
+def get_vector_layout(client, collection_name="jobs", refresh=False):
+    """Return LAYOUT_NAMED or LAYOUT_SINGLE for the collection, plus its sparse vector names."""
+    if refresh or collection_name not in _layouts:
+        params = client.get_collection(collection_name).config.params
+        layout = LAYOUT_NAMED if isinstance(params.vectors, dict) else LAYOUT_SINGLE
+        sparse = set((params.sparse_vectors or {}).keys())
+        _layouts[collection_name] = (layout, sparse)
+    return _layouts[collection_name]
+
+def title_text(job):
+    return f"{job['title']} {job['company']} {job['location']}"
+
+def content_text(job):
+    skills = job.get('skills') or ''
+    if isinstance(skills, (list, tuple)):
+        skills = ', '.join(str(skill) for skill in skills)
+    parts = [job.get('title') or '', skills, job.get('description') or '']
+    return '\n'.join(part for part in parts if part)
+
+def chunk_text(text, chunk_words=CHUNK_WORDS, overlap=CHUNK_OVERLAP, max_chunks=MAX_CHUNKS):
+    words = text.split()
+    if not words:
+        return []
+    step = max(chunk_words - overlap, 1)
+    chunks = []
+    for start in range(0, len(words), step):
+        chunks.append(' '.join(words[start:start + chunk_words]))
+        if len(chunks) >= max_chunks or start + chunk_words >= len(words):
+            break
+    return chunks
+
+def mean_vector(vectors):
+    # Average the chunk vectors and renormalise for cosine distance
+    mean = [sum(values) / len(vectors) for values in zip(*vectors)]
+    norm = math.sqrt(sum(value * value for value in mean))
+    return [value / norm for value in mean] if norm else mean
+
+def _token_index(token):
+    # Stable across processes, unlike hash()
+    return int.from_bytes(hashlib.blake2b(token.encode('utf-8'), digest_size=4).digest(), 'big')
+
+def sparse_keyword_vector(text):
+    counts = {}
+    for token in _TOKEN_RE.findall((text or '').lower()):
+        index = _token_index(token.rstrip('.'))
+        counts[index] = counts.get(index, 0) + 1
+    indices = sorted(counts)
+    return models.SparseVector(indices=indices, values=[1.0 + math.log(counts[i]) for i in indices])
+
+def build_job_vectors(embedder, jobs, layout=LAYOUT_NAMED, sparse_names=(KEYWORD_VECTOR,), batch_size=64):
+    """Vectors for a list of jobs, ready for PointStruct(vector=...).
+
+    For a single-vector collection this is the title vector alone. For
+    the named layout every job gets a title vector, a content vector
+    averaged over its chunks and, if the collection has it, a sparse
+    keyword vector. All chunks of all jobs are encoded in one pass.
+    """
+    titles = embedder.encode([title_text(job) for job in jobs], batch_size=batch_size)
+    if layout == LAYOUT_SINGLE:
+        return titles
+
+    chunks, owners = [], []
+    for position, job in enumerate(jobs):
+        for chunk in chunk_text(content_text(job)):
+            chunks.append(chunk)
+            owners.append(position)
+    chunk_vectors = embedder.encode(chunks, batch_size=batch_size)
+
+    per_job = [[] for _ in jobs]
+    for position, vector in zip(owners, chunk_vectors):
+        per_job[position].append(vector)
+
+    vectors = []
+    for job, title_vector, job_chunks in zip(jobs, titles, per_job):
+        vector = {
+            TITLE_VECTOR: title_vector,
+            CONTENT_VECTOR: mean_vector(job_chunks) if job_chunks else title_vector,
+        }
+        if KEYWORD_VECTOR in sparse_names:
+            keywords = sparse_keyword_vector(content_text(job))
+            if keywords.indices:
+                vector[KEYWORD_VECTOR] = keywords
+        vectors.append(vector)
+    return vectors
+
+def query_jobs(client, embedder, text, query_filter=None, limit=10, offset=0, using=None,
+               score_threshold=None, with_payload=True, collection_name="jobs"):
+    """Rank jobs against free text.
+
+    using picks one named vector (TITLE_VECTOR, CONTENT_VECTOR or
+    KEYWORD_VECTOR) and returns its similarity scores. Without it, the
+    named vectors are fused with reciprocal rank fusion. Single-vector
+    collections always search their one vector.
+    """
+    args = (client, embedder, text, query_filter, limit, offset, using, score_threshold, with_payload, collection_name)
+    try:
+        return _query_jobs(*args)
+    except Exception as e:
+        if 'vector' not in str(e).lower():
+            raise
+        # The collection was recreated with another layout since it was
+        # cached (init_db.py); look it up again and retry once
+        return _query_jobs(*args, refresh=True)
+
+def _query_jobs(client, embedder, text, query_filter, limit, offset, using, score_threshold, with_payload,
+                collection_name, refresh=False):
+    layout, sparse_names = get_vector_layout(client, collection_name, refresh=refresh)
+    common = dict(
+        collection_name=collection_name,
+        query_filter=query_filter,
+        limit=limit,
+        offset=offset,
+        with_payload=with_payload,
+        with_vectors=False,
+    )
+
+    if layout == LAYOUT_SINGLE:
+        return client.query_points(query=embedder.encode_one(text), score_threshold=score_threshold, **common).points
+
+    if using == KEYWORD_VECTOR:
+        return client.query_points(query=sparse_keyword_vector(text), using=KEYWORD_VECTOR,
+                                   score_threshold=score_threshold, **common).points
+    if using:
+        return client.query_points(query=embedder.encode_one(text), using=using,
+                                   score_threshold=score_threshold, **common).points
+
+    # Every prefetch has to reach past the requested page
+    dense = embedder.encode_one(text)
+    depth = offset + limit
+    prefetch = [
+        models.Prefetch(query=dense, using=TITLE_VECTOR, filter=query_filter, limit=depth),
+        models.Prefetch(query=dense, using=CONTENT_VECTOR, filter=query_filter, limit=depth),
+    ]
+    if KEYWORD_VECTOR in sparse_names:
+        prefetch.append(models.Prefetch(query=sparse_keyword_vector(text), using=KEYWORD_VECTOR,
+                                        filter=query_filter, limit=depth))
+    return client.query_points(prefetch=prefetch, query=models.FusionQuery(fusion=models.Fusion.RRF), **common).points
@@ -0,0 +1,56 @@
+import os
+import httpx
+from qdrant_client import QdrantClient
+from config import env_flag, lazy_singleton
+
+def _create_client():
+    qdrant_url = os.getenv("QDRANT_URL")
+    qdrant_api_key = os.getenv("QDRANT_API_KEY")
+
+    # Connection settings shared by the backend and the scrapers
+    timeout = int(os.getenv("QDRANT_TIMEOUT", "30"))
+    prefer_grpc = env_flag("QDRANT_PREFER_GRPC")
+    grpc_port = int(os.getenv("QDRANT_GRPC_PORT", "6334"))
+
+    # Keep-alive pool for the REST transport (ignored when gRPC is used)
+    limits = httpx.Limits(
+        max_connections=int(os.getenv("QDRANT_MAX_CONNECTIONS", "20")),
+        max_keepalive_connections=int(os.getenv("QDRANT_MAX_KEEPALIVE", "10")),
+        keepalive_expiry=float(os.getenv("QDRANT_KEEPALIVE_EXPIRY", "60"))
+    )
+
+    if qdrant_url and qdrant_api_key:
+        # Use cloud Qdrant
+        return QdrantClient(
+            url=qdrant_url,
+            api_key=qdrant_api_key,
+            prefer_grpc=prefer_grpc,
+            grpc_port=grpc_port,
+            timeout=timeout,
+            limits=limits
+        )
+    else:
+        # Fallback to local Qdrant
+        return QdrantClient(
+            host=os.getenv("QDRANT_HOST", "localhost"),
+            port=int(os.getenv("QDRANT_PORT", "6333")),
+            prefer_grpc=prefer_grpc,
+            grpc_port=grpc_port,
+            timeout=timeout,
+            limits=limits
+        )
+
+@lazy_singleton
+def get_qdrant_client():
+    """Return the process-wide Qdrant client, creating it on first use.
+
+    QdrantClient is thread-safe and keeps its connections alive, so every
+    request and scraper run shares one client instead of reconnecting.
+    """
+    return _create_client()
+
+def close_qdrant_client():
+    """Close the shared client, e.g. at the end of a scraper run."""
+    client = get_qdrant_client.reset()
+    if client is not None:
+        client.close()
@@ -0,0 +1,106 @@
+import os
+import sys
+
+# Backend modules import each other by bare name
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import cv_pipeline
+from gemini_analyzer import IncrementalAnalysisParser
+
+ANALYSIS = """Technical Skills:
+- Python
+
+Experience:
+- 3 years as a data engineer
+
+Improvements:
+- Add a summary
+
+Categories:
+- Data Engineer
+
+Score: 81/100
+"""
+
+def fake_streaming(cv_json, on_section):
+    parser = IncrementalAnalysisParser()
+    for line in ANALYSIS.splitlines(keepends=True):
+        for name, value in parser.feed(line):
+            on_section(name, value)
+    for name, value in parser.close():
+        on_section(name, value)
+    return parser.results, "gemini"
+
+def test_streamed_match_uses_final_sections(tmp_path, monkeypatch):
+    calls = []
+
+    def fake_match(skills, categories, summary='', query_filter=None):
+        calls.append((list(skills), list(categories), summary))
+        return [{'title': 'Data Engineer'}]
+
+    monkeypatch.setattr(cv_pipeline, 'extract_text_from_pdf', lambda path: 'cv text')
+    monkeypatch.setattr(cv_pipeline, 'cv_to_json', lambda text: '{}')
+    monkeypatch.setattr(cv_pipeline, 'analyze_cv_streaming', fake_streaming)
+    monkeypatch.setattr(cv_pipeline, 'find_matching_jobs', fake_match)
+    monkeypatch.setattr(cv_pipeline, 'get_analysis_cache', lambda: None)
+    monkeypatch.setattr(cv_pipeline, 'GEMINI_OUTPUT_MODE', 'text')
+
+    cv = tmp_path / 'cv.pdf'
+    cv.write_bytes(b'%PDF')
+    events = []
+    result = cv_pipeline.run_cv_analysis(str(cv), emit=lambda name, value: events.append(name), stream=True)
+
+    # One match, on the same sections a buffered analysis would use
+    assert calls == [(['Python'], ['Data Engineer'], '3 years as a data engineer')]
+    assert result['recommendations'] == [{'title': 'Data Engineer'}]
+    assert result['score'] == 81
+    assert events.count('recommendations') == 1
+    assert events.index('recommendations') > events.index('categories')
+
+class Chunk:
+    def __init__(self, text):
+        self.text = text
+
+def test_failed_stream_resets_sections_and_rematches(tmp_path, monkeypatch):
+    import gemini_analyzer
+
+    def broken_stream(prompt, handle_response, stream=False, generation_config=None):
+        def chunks():
+            yield Chunk("Technical Skills:\n- Rust\n\nExperience:\n- 1 year\n\nCategories:\n- Systems\n\n")
+            raise RuntimeError("stream interrupted")
+        try:
+            handle_response(chunks())
+        except RuntimeError:
+            pass
+        return None, False
+
+    calls = []
+
+    def fake_match(skills, categories, summary='', query_filter=None):
+        calls.append(list(skills))
+        return [{'title': f"{skills[0]} job"}]
+
+    monkeypatch.setattr(gemini_analyzer, 'api_key', 'test-key')
+    monkeypatch.setattr(gemini_analyzer, '_call_gemini', broken_stream)
+    monkeypatch.setattr(gemini_analyzer, 'fallback_cv_analysis', lambda cv_json: ANALYSIS)
+    monkeypatch.setattr(cv_pipeline, 'extract_text_from_pdf', lambda path: 'cv text')
+    monkeypatch.setattr(cv_pipeline, 'cv_to_json', lambda text: '{}')
+    monkeypatch.setattr(cv_pipeline, 'find_matching_jobs', fake_match)
+    monkeypatch.setattr(cv_pipeline, 'get_analysis_cache', lambda: None)
+    monkeypatch.setattr(cv_pipeline, 'GEMINI_OUTPUT_MODE', 'text')
+
+    cv = tmp_path / 'cv.pdf'
+    cv.write_bytes(b'%PDF')
+    events = []
+    result = cv_pipeline.run_cv_analysis(str(cv), emit=lambda name, value: events.append((name, value)), stream=True)
+
+    assert result['skills'] == ['Python']
+    assert result['recommendations'] == [{'title': 'Python job'}]
+    assert calls[-1] == ['Python']
+
+    # After the reset every section is sent once, with the fallback values
+    names = [name for name, _ in events]
+    assert names.count('reset') == 1
+    after_reset = events[names.index('reset') + 1:]
+    assert sorted(name for name, _ in after_reset) == sorted(cv_pipeline.ANALYSIS_SECTIONS + ('recommendations',))
+    assert dict(after_reset)['recommendations'] == [{'title': 'Python job'}]
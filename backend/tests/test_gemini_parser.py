@@ -0,0 +1,142 @@
+import os
+import sys
+
+# Backend modules import each other by bare name
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+from gemini_analyzer import IncrementalAnalysisParser, parse_gemini_output, fallback_cv_analysis
+
+MARKDOWN_ANALYSIS = """## **Technical Skills:**
+- Python (5/5)
+- SQL (4/5)
+
+**Soft Skills:** Communication
+- Teamwork
+
+**Experience:**
+- 4 years as a backend developer
+- Fintech and e-commerce
+
+**Education:**
+- BSc in Computer Science
+
+**Improvements:**
+- Quantify achievements
+
+**Categories:**
+- Software Engineering
+- Backend Developer
+
+**Score:** 78/100
+- Skills: 20/25
+- Experience: 22/25
+Education: 18/25
+Presentation: 18/25
+"""
+
+NUMBERED_ANALYSIS = """1. Technical Skills
+* Java
+2. Experience: 2 years in QA
+3. Improvements
+* Add a summary
+4. Categories: Testing
+5. Overall Score: 64
+Skills: 15/25
+"""
+
+REWORDED_ANALYSIS = """Technical Skills:
+- Python
+- Kubernetes: advanced
+
+Work Experience:
+- 5 years at Acme
+
+Certifications:
+- AWS Solutions Architect
+
+Areas for Improvement:
+- Add measurable results
+
+Suggested Job Categories:
+- Platform Engineering
+
+Job Titles:
+- Site Reliability Engineer
+
+Score: 72/100
+Breakdown:
+Skills: 20/25
+Experience: 18/25
+"""
+
+def stream(text, chunk_size):
+    parser = IncrementalAnalysisParser()
+    sections = []
+    for start in range(0, len(text), chunk_size):
+        sections.extend(parser.feed(text[start:start + chunk_size]))
+    sections.extend(parser.close())
+    return parser.results, sections
+
+def test_inline_headers_and_subscores():
+    results = parse_gemini_output(MARKDOWN_ANALYSIS)
+    assert results['score'] == 78
+    assert results['skills'] == ['Python (5/5)', 'SQL (4/5)', 'Communication', 'Teamwork']
+    assert results['categories'] == ['Software Engineering', 'Backend Developer']
+    assert results['experience'] == ['4 years as a backend developer', 'Fintech and e-commerce']
+
+def test_numbered_headers_with_inline_values():
+    results = parse_gemini_output(NUMBERED_ANALYSIS)
+    assert results['score'] == 64
+    assert results['experience'] == ['2 years in QA']
+    assert results['categories'] == ['Testing']
+
+def test_missing_sections_get_placeholders():
+    results = parse_gemini_output("Score: 40/100")
+    assert results == {
+        'skills': ['No specific skills detected'],
+        'experience': ['No experience detected'],
+        'improvements': ['Add more details to your CV'],
+        'categories': ['General'],
+        'score': 40
+    }
+
+@pytest.mark.parametrize("text", [
+    MARKDOWN_ANALYSIS,
+    NUMBERED_ANALYSIS,
+    REWORDED_ANALYSIS,
+    fallback_cv_analysis({'skills': ['Python'], 'experience': [{'title': 'Developer', 'company': 'Acme'}]}),
+])
+@pytest.mark.parametrize("chunk_size", [1, 7, 64, 100000])
+def test_streamed_matches_buffered(text, chunk_size):
+    results, sections = stream(text, chunk_size)
+    assert results == parse_gemini_output(text)
+    # Every field is reported exactly once, with its final value
+    assert sorted(name for name, _ in sections) == sorted(results)
+    assert dict(sections) == results
+
+def test_reworded_headers():
+    results = parse_gemini_output(REWORDED_ANALYSIS)
+    assert results['skills'] == ['Python', 'Kubernetes: advanced']
+    assert results['experience'] == ['5 years at Acme']
+    assert results['improvements'] == ['Add measurable results']
+    assert results['categories'] == ['Platform Engineering', 'Site Reliability Engineer']
+    assert results['score'] == 72
+
+@pytest.mark.parametrize("header, field", [
+    ("Work Experience:", 'experience'),
+    ("Professional Experience:", 'experience'),
+    ("Job Categories:", 'categories'),
+    ("Suggested Job Categories:", 'categories'),
+    ("Areas for Improvement:", 'improvements'),
+    ("Key Skills:", 'skills'),
+])
+def test_header_variants(header, field):
+    results = parse_gemini_output(f"Summary:\n- ignored\n\n{header}\n- item one\n")
+    assert results[field] == ['item one']
+    assert 'ignored' not in sum((value for value in results.values() if isinstance(value, list)), [])
+
+def test_unknown_header_closes_section():
+    results = parse_gemini_output("Skills:\n- Python\n\nLanguages:\n- Sinhala\n- English\n")
+    assert results['skills'] == ['Python']
+    assert results['experience'] == ['No experience detected']
@@ -0,0 +1,30 @@
+import os
+import sys
+
+# Backend modules import each other by bare name
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from qdrant_client import QdrantClient, models
+import job_vectors
+from job_vectors import query_jobs, get_vector_layout, dense_vectors_config, sparse_vectors_config
+from embedding_service import EMBEDDING_DIM
+
+class FakeEmbedder:
+    def encode_one(self, text):
+        return [1.0] + [0.0] * (EMBEDDING_DIM - 1)
+
+def test_query_refreshes_a_stale_layout(monkeypatch):
+    monkeypatch.setattr(job_vectors, '_layouts', {})
+    client = QdrantClient(':memory:')
+    client.create_collection("jobs", vectors_config=models.VectorParams(size=EMBEDDING_DIM, distance=models.Distance.COSINE))
+    assert get_vector_layout(client)[0] == job_vectors.LAYOUT_SINGLE
+
+    # Recreated with named and sparse vectors behind the cached layout
+    client.delete_collection("jobs")
+    client.create_collection("jobs", vectors_config=dense_vectors_config(), sparse_vectors_config=sparse_vectors_config())
+    vector = FakeEmbedder().encode_one('')
+    client.upsert("jobs", [models.PointStruct(id=1, vector={'title': vector, 'content': vector}, payload={'title': 'Engineer'})])
+
+    points = query_jobs(client, FakeEmbedder(), "engineer")
+    assert [point.id for point in points] == [1]
+    assert get_vector_layout(client)[0] == job_vectors.LAYOUT_NAMED
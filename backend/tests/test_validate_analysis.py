@@ -0,0 +1,94 @@
+import os
+import sys
+
+# Backend modules import each other by bare name
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import json
+import pytest
+import gemini_analyzer
+from gemini_analyzer import validate_analysis, analyze_cv_structured, AnalysisValidationError
+
+def valid_analysis(**overrides):
+    data = {
+        "technical_skills": [{"name": "Python", "rating": 5}, {"name": "SQL", "rating": 3}],
+        "soft_skills": ["Teamwork"],
+        "experience": ["4 years as a backend developer"],
+        "education": ["BSc Computer Science"],
+        "improvements": ["Quantify achievements"],
+        "categories": ["Software Engineering"],
+        "job_titles": ["Backend Developer"],
+        "score": 82,
+        "subscores": {"skills": 22, "experience": 20, "education": 20, "presentation": 20},
+    }
+    data.update(overrides)
+    return data
+
+def test_valid_analysis():
+    analysis = validate_analysis(valid_analysis())
+    assert analysis.issues == []
+    assert analysis.to_parsed() == {
+        'skills': ['Python', 'SQL', 'Teamwork'],
+        'experience': ['4 years as a backend developer'],
+        'improvements': ['Quantify achievements'],
+        'categories': ['Software Engineering', 'Backend Developer'],
+        'score': 82
+    }
+
+def test_out_of_range_values_are_clamped():
+    analysis = validate_analysis(valid_analysis(
+        technical_skills=[{"name": "Python", "rating": 7}, {"name": "SQL", "rating": 0}],
+        score=120,
+        subscores={"skills": 30, "experience": -1, "education": 20, "presentation": 20},
+    ))
+    assert [skill['rating'] for skill in analysis.technical_skills] == [5, 1]
+    assert analysis.score == 100
+    assert analysis.subscores == {"skills": 25, "experience": 0, "education": 20, "presentation": 20}
+    assert len(analysis.issues) == 5
+
+def test_unusable_values_are_dropped_and_the_rest_kept():
+    analysis = validate_analysis(valid_analysis(
+        technical_skills=[{"name": "Python", "rating": "high"}, {"rating": 3}, "Go"],
+        soft_skills=["Teamwork", 3, " "],
+        subscores={"skills": "n/a", "experience": 20, "education": 20, "presentation": 20},
+    ))
+    assert analysis.technical_skills == [{'name': 'Python', 'rating': None}]
+    assert analysis.soft_skills == ["Teamwork"]
+    assert analysis.subscores == {"experience": 20, "education": 20, "presentation": 20}
+    assert analysis.experience == ["4 years as a backend developer"]
+    assert analysis.score == 82
+
+def test_missing_score_uses_complete_subscores():
+    data = valid_analysis()
+    del data['score']
+    analysis = validate_analysis(data)
+    assert analysis.score == 82
+    assert analysis.issues == ["missing fields: score"]
+
+def test_missing_lists_become_placeholders():
+    analysis = validate_analysis({"score": 40})
+    assert analysis.to_parsed()['skills'] == ['No specific skills detected']
+    assert analysis.score == 40
+
+@pytest.mark.parametrize("data", [[], "text", {}, {"unrelated": 1}])
+def test_nothing_usable_raises(data):
+    with pytest.raises(AnalysisValidationError):
+        validate_analysis(data)
+
+class Response:
+    def __init__(self, text):
+        self.text = text
+
+def test_invalid_json_falls_back_without_a_second_call(monkeypatch):
+    calls = []
+
+    def fake_call(prompt, handle_response, stream=False, generation_config=None):
+        calls.append(prompt)
+        return handle_response(Response("not json")), True
+
+    monkeypatch.setattr(gemini_analyzer, 'api_key', 'test-key')
+    monkeypatch.setattr(gemini_analyzer, '_call_gemini', fake_call)
+    parsed, source = analyze_cv_structured(json.dumps({'skills': ['Python']}))
+    assert source == "fallback"
+    assert parsed['skills'] == ['Python']
+    assert len(calls) == 1
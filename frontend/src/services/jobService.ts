@@ -19,6 +19,7 @@ interface SearchFilters {
   jobType?: string;
   page?: number;
   per_page?: number;
+  mode?: 'keyword' | 'semantic';
 }
 
 export const fetchJobsFromQdrant = async () => {
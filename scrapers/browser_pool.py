@@ -0,0 +1,148 @@
+import asyncio
+import time
+import logging
+from contextlib import asynccontextmanager
+from playwright.async_api import async_playwright
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CONTEXT_OPTIONS = {
+    "user_agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+    "viewport": {"width": 1200, "height": 2000},
+}
+
+class BrowserPoolExhausted(RuntimeError):
+    pass
+
+class _ContextSlot:
+    def __init__(self, browser, context):
+        self.browser = browser
+        self.context = context
+        self.uses = 0
+
+class BrowserPool:
+    """A fixed set of warm Chromium browsers and contexts shared by the scrapers.
+
+    Pages are handed out through an async semaphore, one at a time per
+    context. A context is closed and replaced after max_context_uses
+    pages so cookies and memory do not pile up, or straight away when it
+    cannot open a page. If no replacement can be created the slot is
+    dropped and the pool shrinks; once it is empty page() raises
+    BrowserPoolExhausted instead of waiting.
+
+        async with BrowserPool(browsers=1, contexts_per_browser=4) as pool:
+            async with pool.page() as page:
+                await page.goto(url)
+    """
+
+    def __init__(self, browsers=1, contexts_per_browser=2, max_context_uses=50, headless=True, context_options=None):
+        self.browser_count = browsers
+        self.contexts_per_browser = contexts_per_browser
+        self.max_context_uses = max_context_uses
+        self.headless = headless
+        self.context_options = context_options or DEFAULT_CONTEXT_OPTIONS
+
+        self._playwright = None
+        self._browsers = []
+        self._idle = None
+        self._semaphore = None
+        self._size = 0
+        self._metrics = {
+            'pages_served': 0,
+            'contexts_recycled': 0,
+            'contexts_lost': 0,
+            'in_use': 0,
+            'wait_seconds': 0.0,
+            'startup_seconds': 0.0,
+        }
+
+    async def start(self):
+        started = time.perf_counter()
+        self._playwright = await async_playwright().start()
+        self._idle = asyncio.Queue()
+
+        for _ in range(self.browser_count):
+            browser = await self._playwright.chromium.launch(headless=self.headless)
+            self._browsers.append(browser)
+            for _ in range(self.contexts_per_browser):
+                context = await browser.new_context(**self.context_options)
+                self._idle.put_nowait(_ContextSlot(browser, context))
+                self._size += 1
+
+        self._semaphore = asyncio.Semaphore(self.browser_count * self.contexts_per_browser)
+        self._metrics['startup_seconds'] = time.perf_counter() - started
+        logger.info(f"Browser pool started: {self.browser_count} browsers, "
+                    f"{self.browser_count * self.contexts_per_browser} contexts "
+                    f"in {self._metrics['startup_seconds']:.2f}s")
+        return self
+
+    async def close(self):
+        for browser in self._browsers:
+            try:
+                await browser.close()
+            except Exception as e:
+                logger.error(f"Error closing browser: {str(e)}")
+        self._browsers = []
+        if self._playwright:
+            await self._playwright.stop()
+            self._playwright = None
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def _recycle(self, slot):
+        try:
+            await slot.context.close()
+        except Exception as e:
+            logger.error(f"Error closing browser context: {str(e)}")
+        slot.context = await slot.browser.new_context(**self.context_options)
+        slot.uses = 0
+        self._metrics['contexts_recycled'] += 1
+
+    def _drop(self, slot):
+        # The slot is never re-queued; once the last one is gone, wake
+        # every waiter with the None sentinel instead of leaving it blocked
+        self._size -= 1
+        self._metrics['contexts_lost'] += 1
+        logger.error(f"Dropped a browser context, {self._size} left in the pool")
+        if self._size <= 0:
+            self._idle.put_nowait(None)
+
+    @asynccontextmanager
+    async def page(self):
+        waited = time.perf_counter()
+        async with self._semaphore:
+            slot = await self._idle.get()
+            if slot is None:
+                self._idle.put_nowait(None)
+                raise BrowserPoolExhausted("No usable browser contexts left in the pool")
+            self._metrics['wait_seconds'] += time.perf_counter() - waited
+            self._metrics['in_use'] += 1
+            page = None
+            try:
+                page = await slot.context.new_page()
+                yield page
+            finally:
+                if page is not None:
+                    try:
+                        await page.close()
+                    except Exception:
+                        pass
+                slot.uses += 1
+                self._metrics['pages_served'] += 1
+                self._metrics['in_use'] -= 1
+                # A context that could not open a page is replaced right away
+                if page is None or slot.uses >= self.max_context_uses:
+                    try:
+                        await self._recycle(slot)
+                    except Exception:
+                        self._drop(slot)
+                        raise
+                self._idle.put_nowait(slot)
+
+    @property
+    def metrics(self):
+        return dict(self._metrics)
@@ -0,0 +1,74 @@
+import hashlib
+import logging
+from qdrant_client.http import models
+
+logger = logging.getLogger(__name__)
+
+def _listing_key(listing_id):
+    # 8-byte digest instead of the full listing id string keeps the seen set small
+    return hashlib.blake2b(str(listing_id).encode('utf-8'), digest_size=8).digest()
+
+def compact_duplicate_listings(client, collection_name="jobs", page_size=1000, delete_chunk_size=500, partitions=1):
+    """Delete points that repeat a listing_id, keeping the first one scrolled.
+
+    Only listing_id is fetched, the scroll follows Qdrant's
+    next_page_offset cursor and deletes go out in chunks of at most
+    delete_chunk_size ids. With partitions > 1 the collection is scanned
+    once per partition and each pass only tracks listing ids hashing into
+    it, so memory stays bounded for very large catalogues.
+
+    Returns {'examined': points checked, 'removed': duplicates deleted}.
+    """
+    stats = {'examined': 0, 'removed': 0}
+
+    def _delete(point_ids):
+        client.delete(
+            collection_name=collection_name,
+            points_selector=models.PointIdsList(points=point_ids)
+        )
+        stats['removed'] += len(point_ids)
+
+    for partition in range(partitions):
+        seen = set()
+        to_delete = []
+        offset = None
+
+        while True:
+            points, offset = client.scroll(
+                collection_name=collection_name,
+                offset=offset,
+                limit=page_size,
+                with_payload=["listing_id"],
+                with_vectors=False
+            )
+
+            for point in points:
+                listing_id = (point.payload or {}).get('listing_id')
+                if listing_id is None:
+                    # Nothing to compare against; count it once
+                    if partition == 0:
+                        stats['examined'] += 1
+                    continue
+
+                key = _listing_key(listing_id)
+                if int.from_bytes(key, 'big') % partitions != partition:
+                    continue
+
+                stats['examined'] += 1
+                if key in seen:
+                    to_delete.append(point.id)
+                else:
+                    seen.add(key)
+
+                if len(to_delete) >= delete_chunk_size:
+                    _delete(to_delete)
+                    to_delete = []
+
+            if offset is None:
+                break
+
+        if to_delete:
+            _delete(to_delete)
+
+    logger.info(f"Compaction examined {stats['examined']} jobs and removed {stats['removed']} duplicates")
+    return stats
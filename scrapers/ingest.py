@@ -0,0 +1,112 @@
+import time
+import json
+import hashlib
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from job_vectors import build_job_vectors
+
+logger = logging.getLogger(__name__)
+
+# Payload fields that define a listing's content. Volatile fields such as
+# posted_date ("5 days ago") or tracking parameters in job_url are left out
+# so an unchanged listing keeps the same fingerprint between runs.
+CONTENT_FIELDS = ('title', 'company', 'location', 'type', 'description', 'skills', 'closing_date')
+
+def job_fingerprint(job):
+    content = {field: job.get(field) for field in CONTENT_FIELDS}
+    encoded = json.dumps(content, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+
+def probe_existing(client, point_ids, collection_name="jobs", chunk_size=256, with_hashes=True):
+    """Look up which of point_ids already exist in Qdrant.
+
+    Returns {point_id: content_hash} (None for points without a stored
+    hash, or for every point when with_hashes=False). Cost scales with
+    the number of candidate ids, not with the size of the collection.
+    """
+    existing = {}
+    unique_ids = list(dict.fromkeys(point_ids))
+    for start in range(0, len(unique_ids), chunk_size):
+        points = client.retrieve(
+            collection_name=collection_name,
+            ids=unique_ids[start:start + chunk_size],
+            with_payload=["content_hash"] if with_hashes else False,
+            with_vectors=False
+        )
+        existing.update((p.id, (p.payload or {}).get('content_hash')) for p in points)
+    return existing
+
+def split_changed(candidates, existing_hashes):
+    """Split (point_id, job) pairs into changed and unchanged.
+
+    candidates must carry job['content_hash']; existing_hashes maps point
+    ids already stored in Qdrant to their stored content_hash.
+    """
+    changed, unchanged_ids = [], []
+    for point_id, job in candidates:
+        if existing_hashes.get(point_id) == job['content_hash']:
+            unchanged_ids.append(point_id)
+        else:
+            changed.append((point_id, job))
+    return changed, unchanged_ids
+
+def embed_jobs_in_batches(embedder, jobs, layout, sparse_names=(), batch_size=64):
+    # One forward pass per batch instead of one per job; the embedding
+    # service skips texts already in the embedding cache
+    vectors = []
+    for start in range(0, len(jobs), batch_size):
+        vectors.extend(build_job_vectors(
+            embedder, jobs[start:start + batch_size], layout, sparse_names, batch_size=batch_size
+        ))
+    return vectors
+
+def upsert_in_chunks(client, points, collection_name="jobs", chunk_size=256, workers=1, wait=True, isolate_failures=False):
+    """Write points in chunks, optionally from several threads.
+
+    Returns the number of points written. With isolate_failures=True a
+    failed chunk is retried point by point so one bad row does not drop
+    the rest of its chunk. With wait=False Qdrant acknowledges each chunk
+    before it is indexed.
+    """
+    chunks = [points[i:i + chunk_size] for i in range(0, len(points), chunk_size)]
+
+    def _upsert(chunk):
+        try:
+            client.upsert(collection_name=collection_name, points=chunk, wait=wait)
+            return len(chunk)
+        except Exception as e:
+            if not isolate_failures:
+                raise
+            logger.warning(f"Chunk upsert failed, retrying {len(chunk)} points one by one: {str(e)}")
+
+        written = 0
+        for point in chunk:
+            try:
+                client.upsert(collection_name=collection_name, points=[point], wait=wait)
+                written += 1
+            except Exception as e:
+                logger.error(f"Error upserting point {point.id}: {str(e)}")
+        return written
+
+    if workers <= 1 or len(chunks) <= 1:
+        return sum(_upsert(chunk) for chunk in chunks)
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return sum(executor.map(_upsert, chunks))
+
+def touch_points(client, point_ids, payload, collection_name="jobs", chunk_size=1000, wait=True):
+    # Partial payload update, e.g. to refresh the expiry timestamp of
+    # listings that were seen again but did not change
+    for start in range(0, len(point_ids), chunk_size):
+        client.set_payload(
+            collection_name=collection_name,
+            payload=payload,
+            points=point_ids[start:start + chunk_size],
+            wait=wait
+        )
+
+def log_throughput(stage, count, started):
+    # started is a time.perf_counter() reading taken before the stage ran
+    elapsed = time.perf_counter() - started
+    rate = count / elapsed if elapsed > 0 else 0.0
+    logger.info(f"{stage}: {count} jobs in {elapsed:.2f}s ({rate:.1f} jobs/sec)")
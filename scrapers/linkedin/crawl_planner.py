@@ -0,0 +1,95 @@
+import asyncio
+import itertools
+import json
+import os
+import sys
+import logging
+
+# generate_linkedin_job_search_url lives in backend/urlgen
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(ROOT_DIR)
+sys.path.append(os.path.join(ROOT_DIR, 'backend', 'urlgen'))
+from linkedinurl import generate_linkedin_job_search_url
+from scrapers.linkedin.linkscrape import scrape_linkedin_jobs
+from scrapers.linkedin.guest_api import create_session
+
+logger = logging.getLogger(__name__)
+
+# Same search the scraper used to hard-code in INITIAL_URL. Each filter set
+# holds extra generate_linkedin_job_search_url arguments, e.g.
+# {"job_type": ["F"], "date_posted": "r604800"}
+DEFAULT_CRAWL_CONFIG = {
+    "keywords": ["Software Developer"],
+    "locations": [{"location": "Sri Lanka", "geoId": "100446352"}],
+    "filters": [{}],
+    "max_jobs_per_query": 1000,
+    "concurrency": 2,
+}
+
+def load_crawl_config(path=None):
+    # LINKEDIN_CRAWL_CONFIG may point at a JSON file overriding the defaults
+    path = path or os.getenv("LINKEDIN_CRAWL_CONFIG")
+    config = dict(DEFAULT_CRAWL_CONFIG)
+    if path:
+        with open(path, 'r', encoding='utf-8') as f:
+            config.update(json.load(f))
+    return config
+
+def plan_search_urls(config):
+    """Expand keywords x locations x filter sets into search URLs."""
+    urls = []
+    for keywords, location, filters in itertools.product(
+        config["keywords"], config["locations"], config.get("filters") or [{}]
+    ):
+        if isinstance(location, str):
+            location = {"location": location}
+        url = generate_linkedin_job_search_url(keywords=keywords, **location, **filters)
+        if url not in urls:
+            urls.append(url)
+    return urls
+
+async def crawl_linkedin(config=None, pool=None, on_jobs=None):
+    """Run every planned search with bounded concurrency.
+
+    Listing ids are deduped across searches through one shared set, so
+    each search can go as deep as max_jobs_per_query without the results
+    of one capping the others. All searches share one HTTP session for
+    the guest API. If given, `await on_jobs(jobs)` receives the new jobs
+    of each search as soon as it finishes.
+    """
+    config = config or load_crawl_config()
+    urls = plan_search_urls(config)
+    seen_job_ids = set()
+    semaphore = asyncio.Semaphore(config.get("concurrency", 2))
+    logger.info(f"Planned {len(urls)} LinkedIn searches")
+
+    async with create_session(connections=config.get("concurrency", 2) * 2) as session:
+        async def run_search(url):
+            async with semaphore:
+                try:
+                    jobs = await scrape_linkedin_jobs(
+                        pool,
+                        search_url=url,
+                        seen_job_ids=seen_job_ids,
+                        max_jobs=config.get("max_jobs_per_query", 1000),
+                        session=session
+                    )
+                    logger.info(f"{len(jobs)} new jobs from {url}")
+                except Exception as e:
+                    logger.error(f"LinkedIn search failed for {url}: {str(e)}")
+                    return []
+
+            if on_jobs and jobs:
+                await on_jobs(jobs)
+            return jobs
+
+        results = await asyncio.gather(*(run_search(url) for url in urls))
+
+    all_jobs = [job for jobs in results for job in jobs]
+    logger.info(f"LinkedIn crawl finished: {len(all_jobs)} unique jobs from {len(urls)} searches")
+    return all_jobs
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    for url in plan_search_urls(load_crawl_config()):
+        print(url)
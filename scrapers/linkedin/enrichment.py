@@ -0,0 +1,115 @@
+import asyncio
+import time
+import logging
+from datetime import datetime
+from urllib.parse import urlparse
+from qdrant_client.http import models
+from job_vectors import LAYOUT_NAMED, TITLE_VECTOR, build_job_vectors, get_vector_layout
+from scrapers.linkedin.job_detail_scraper import scrape_job_details
+
+logger = logging.getLogger(__name__)
+
+# Placeholder values scrape_job_details returns for missing fields
+EMPTY_VALUES = ('', 'Not specified', 'Not disclosed', 'Not available')
+
+class HostRateLimiter:
+    """Spaces out requests to the same host to at most `rate` per second."""
+
+    def __init__(self, rate=1.0):
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self._next_slot = {}
+        self._lock = asyncio.Lock()
+
+    async def wait(self, host):
+        async with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(host, now))
+            self._next_slot[host] = slot + self.interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+def _already_enriched(client, point_ids, collection_name, chunk_size=256):
+    enriched = set()
+    for start in range(0, len(point_ids), chunk_size):
+        points = client.retrieve(
+            collection_name=collection_name,
+            ids=point_ids[start:start + chunk_size],
+            with_payload=["enriched_at"],
+            with_vectors=False
+        )
+        enriched.update(p.id for p in points if (p.payload or {}).get('enriched_at'))
+    return enriched
+
+def _update_content_vectors(client, embedder, point_id, job, layout, sparse_names, collection_name):
+    # The listing card has no description; re-embed the content and
+    # keyword vectors now that it has one. The title vector is unchanged.
+    vector = build_job_vectors(embedder, [job], layout, sparse_names)[0]
+    vector.pop(TITLE_VECTOR, None)
+    client.update_vectors(
+        collection_name=collection_name,
+        points=[models.PointVectors(id=point_id, vector=vector)]
+    )
+
+async def enrich_jobs(client, jobs_with_ids, pool=None, workers=4, rate_per_host=1.0, collection_name="jobs",
+                      embedder=None):
+    """Fetch job details for stored listings and merge them into their payload.
+
+    jobs_with_ids is a list of (point_id, job) pairs for points that are
+    already in Qdrant. Listings with an enriched_at field are skipped.
+    Details are fetched by `workers` concurrent pages, at most
+    rate_per_host requests per second per host, and written with partial
+    set_payload updates so the other fields are untouched. With an
+    embedder and a named-vector collection the content and keyword
+    vectors are rebuilt from the fetched description.
+
+    Returns {'enriched', 'skipped', 'failed'} counts.
+    """
+    stats = {'enriched': 0, 'skipped': 0, 'failed': 0}
+    candidates = [(point_id, job) for point_id, job in jobs_with_ids if job.get('job_url')]
+    if not candidates:
+        return stats
+
+    enriched = await asyncio.to_thread(
+        _already_enriched, client, [point_id for point_id, _ in candidates], collection_name
+    )
+    todo = [(point_id, job) for point_id, job in candidates if point_id not in enriched]
+    stats['skipped'] = len(candidates) - len(todo)
+    logger.info(f"Enriching {len(todo)} jobs ({stats['skipped']} already enriched)")
+
+    layout, sparse_names = await asyncio.to_thread(get_vector_layout, client, collection_name)
+    update_vectors = embedder is not None and layout == LAYOUT_NAMED
+
+    semaphore = asyncio.Semaphore(workers)
+    limiter = HostRateLimiter(rate_per_host)
+
+    async def enrich_one(point_id, job):
+        async with semaphore:
+            await limiter.wait(urlparse(job['job_url']).netloc)
+            details = await scrape_job_details(job['job_url'], pool)
+
+        if details.get('status') == 'error':
+            stats['failed'] += 1
+            return
+
+        payload = {key: value for key, value in details.items() if value not in EMPTY_VALUES and value != []}
+        payload['enriched_at'] = datetime.now().isoformat()
+        try:
+            await asyncio.to_thread(
+                client.set_payload,
+                collection_name=collection_name,
+                payload=payload,
+                points=[point_id]
+            )
+            if update_vectors and payload.get('description'):
+                await asyncio.to_thread(
+                    _update_content_vectors, client, embedder, point_id, {**job, **payload},
+                    layout, sparse_names, collection_name
+                )
+            stats['enriched'] += 1
+        except Exception as e:
+            logger.error(f"Error saving details for {job.get('listing_id')}: {str(e)}")
+            stats['failed'] += 1
+
+    await asyncio.gather(*(enrich_one(point_id, job) for point_id, job in todo))
+    logger.info(f"Enrichment finished: {stats}")
+    return stats
@@ -0,0 +1,126 @@
+import asyncio
+import random
+import logging
+from urllib.parse import urlparse, parse_qsl, urlencode
+import aiohttp
+from bs4 import BeautifulSoup
+
+logger = logging.getLogger(__name__)
+
+# Public endpoint that serves the job-card HTML fragments of the search page
+GUEST_API_URL = "https://www.linkedin.com/jobs-guest/jobs/api/seeMoreJobPostings/search"
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+
+# Search-page parameters the fragment endpoint does not need
+IGNORED_PARAMS = {"trk", "position", "pageNum", "start"}
+
+try:
+    import lxml  # noqa: F401
+    HTML_PARSER = "lxml"
+except ImportError:
+    HTML_PARSER = "html.parser"
+
+class GuestApiError(Exception):
+    pass
+
+def guest_api_url(search_url, start=0):
+    """Turn a jobs/search URL into the fragment URL for the page at `start`."""
+    params = [(k, v) for k, v in parse_qsl(urlparse(search_url).query) if k not in IGNORED_PARAMS]
+    params.append(("start", str(start)))
+    return f"{GUEST_API_URL}?{urlencode(params)}"
+
+def _text(card, selector):
+    element = card.select_one(selector)
+    return element.get_text(strip=True) if element else ''
+
+def parse_job_cards(html):
+    """Parse job cards out of a fragment into the scraper's job dict schema."""
+    soup = BeautifulSoup(html, HTML_PARSER)
+    jobs = []
+    for card in soup.select("div.base-card"):
+        listing_id = card.get("data-entity-urn") or ''
+        if not listing_id:
+            continue
+        link = card.select_one("a.base-card__full-link")
+        jobs.append({
+            'title': _text(card, "h3.base-search-card__title"),
+            'company': _text(card, "h4.base-search-card__subtitle a") or _text(card, "h4.base-search-card__subtitle"),
+            'location': _text(card, "span.job-search-card__location"),
+            'posted_date': _text(card, "time.job-search-card__listdate") or _text(card, "time.job-search-card__listdate--new"),
+            'job_url': link.get("href", '') if link else '',
+            'listing_id': listing_id,
+            'source': 'linkedin'
+        })
+    return jobs
+
+async def _fetch_fragment(session, url, retries=3, backoff=1.0):
+    for attempt in range(retries):
+        try:
+            async with session.get(url) as response:
+                if response.status == 200:
+                    return await response.text()
+                # Past the last page the endpoint answers 400 or 404
+                if response.status in (400, 404):
+                    return ''
+                if response.status != 429 and response.status < 500:
+                    raise GuestApiError(f"HTTP {response.status} for {url}")
+                logger.warning(f"Guest API returned {response.status} (attempt {attempt + 1}/{retries})")
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            logger.warning(f"Guest API request failed (attempt {attempt + 1}/{retries}): {str(e)}")
+
+        if attempt < retries - 1:
+            await asyncio.sleep(backoff * (2 ** attempt) + random.uniform(0, 0.5))
+
+    raise GuestApiError(f"Giving up on {url} after {retries} attempts")
+
+def create_session(connections=4):
+    # Pooled keep-alive connections shared by every fragment request
+    return aiohttp.ClientSession(
+        connector=aiohttp.TCPConnector(limit=connections, keepalive_timeout=60),
+        headers={"User-Agent": USER_AGENT, "Accept-Language": "en-US,en;q=0.9"},
+        timeout=aiohttp.ClientTimeout(total=30)
+    )
+
+async def fetch_guest_jobs(search_url, max_jobs=1000, seen_job_ids=None, session=None, retries=3, page_delay=0.5):
+    """Collect job cards for a search URL through the fragment endpoint.
+
+    Pass a session to reuse pooled connections across searches (or to
+    serve saved fixtures in tests), and a shared seen_job_ids set to
+    dedupe across searches; the result is empty when every card was seen
+    already. Raises GuestApiError if the first page cannot be fetched or
+    holds no cards; later failures end the crawl with what was collected.
+    """
+    if session is None:
+        async with create_session() as own_session:
+            return await fetch_guest_jobs(search_url, max_jobs, seen_job_ids, own_session, retries, page_delay)
+
+    seen_job_ids = seen_job_ids if seen_job_ids is not None else set()
+    jobs = []
+    start = 0
+
+    while len(jobs) < max_jobs:
+        try:
+            html = await _fetch_fragment(session, guest_api_url(search_url, start), retries=retries)
+        except GuestApiError:
+            if start == 0:
+                raise
+            logger.warning(f"Guest API stopped at offset {start}; keeping {len(jobs)} jobs")
+            break
+
+        cards = parse_job_cards(html)
+        if not cards:
+            if start == 0:
+                # Blocked or changed markup; no new jobs alone is not a failure
+                raise GuestApiError(f"No job cards on the first page of {search_url}")
+            break
+
+        new_jobs = [job for job in cards if job['listing_id'] not in seen_job_ids]
+        seen_job_ids.update(job['listing_id'] for job in new_jobs)
+        jobs.extend(new_jobs)
+        logger.info(f"Guest API offset {start}: {len(new_jobs)} new jobs, {len(jobs)} total")
+
+        start += len(cards)
+        if page_delay:
+            await asyncio.sleep(page_delay)
+
+    return jobs[:max_jobs]
@@ -1,4 +1,4 @@
-from qdrant_client import QdrantClient
+import sys
 from qdrant_client.http import models
 import os
 from dotenv import load_dotenv
@@ -7,24 +7,14 @@ import logging
 # Load environment variables
 load_dotenv()
 
+# Share the backend's pooled Qdrant client
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'backend'))
+from qdrant_pool import get_qdrant_client
+from job_vectors import dense_vectors_config, sparse_vectors_config
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Get Qdrant configuration
-def get_qdrant_client():
-    qdrant_url = os.getenv("QDRANT_URL")
-    qdrant_api_key = os.getenv("QDRANT_API_KEY")
-    
-    if qdrant_url and qdrant_api_key:
-        # Use cloud Qdrant
-        return QdrantClient(
-            url=qdrant_url,
-            api_key=qdrant_api_key,
-        )
-    else:
-        # Fallback to local Qdrant
-        return QdrantClient("localhost", port=6333)
-
 def init_database():
     try:
         # Connect to Qdrant
@@ -33,10 +23,9 @@ def init_database():
         # Create jobs collection with updated vector size
         client.recreate_collection(
             collection_name="jobs",
-            vectors_config=models.VectorParams(
-                size=384,  # Updated to match SentenceTransformer model
-                distance=models.Distance.COSINE
-            ),
+            # Named title/content vectors plus a sparse keyword vector
+            vectors_config=dense_vectors_config(),
+            sparse_vectors_config=sparse_vectors_config(),
             hnsw_config=models.HnswConfigDiff(
                 m=16,
                 ef_construct=100
@@ -72,6 +61,16 @@ def init_database():
             field_name="processed_timestamp",
             field_schema=models.PayloadSchemaType.DATETIME
         )
+        client.create_payload_index(
+            collection_name="jobs",
+            field_name="closing_date",
+            field_schema=models.PayloadSchemaType.DATETIME
+        )
+        client.create_payload_index(
+            collection_name="jobs",
+            field_name="source",
+            field_schema=models.PayloadSchemaType.KEYWORD
+        )
         
         logger.info("Database initialized successfully")
         return True
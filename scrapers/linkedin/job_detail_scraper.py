@@ -1,20 +1,32 @@
-from playwright.async_api import async_playwright
 import asyncio
+import os
+import sys
 from bs4 import BeautifulSoup
 import logging
 
+# Make the repo root importable when run as a script
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from scrapers.browser_pool import BrowserPool
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-async def scrape_job_details(job_url: str):
+async def scrape_job_details(job_url: str, pool: BrowserPool = None):
+    # Pass a shared pool when fetching many jobs; a browser launch per URL
+    # costs far more than the page itself
+    if pool is None:
+        try:
+            async with BrowserPool(browsers=1, contexts_per_browser=1) as own_pool:
+                return await scrape_job_details(job_url, own_pool)
+        except Exception as e:
+            logger.error(f"Error scraping job details: {str(e)}")
+            return {
+                'error': f"Failed to scrape job details: {str(e)}",
+                'status': 'error'
+            }
+
     try:
-        async with async_playwright() as p:
-            browser = await p.chromium.launch(headless=True)
-            context = await browser.new_context(
-                user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
-            )
-            page = await context.new_page()
-            
+        async with pool.page() as page:
             # Navigate to job page
             await page.goto(job_url, timeout=30000)
             await page.wait_for_selector('.job-view-layout', timeout=10000)
@@ -37,7 +49,6 @@ async def scrape_job_details(job_url: str):
                 };
             }''')
             
-            await browser.close()
             return job_details
 
     except Exception as e:
@@ -50,4 +61,4 @@ async def scrape_job_details(job_url: str):
 # Example usage
 if __name__ == "__main__":
     test_url = "https://www.linkedin.com/jobs/view/123456789"
-    asyncio.run(scrape_job_details(test_url))
\ No newline at end of file
+    asyncio.run(scrape_job_details(test_url))
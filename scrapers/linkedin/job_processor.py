@@ -1,154 +1,240 @@
 from datetime import datetime, timedelta
 import json
 import os
+import sys
+import time
 from dotenv import load_dotenv
-from qdrant_client import QdrantClient
 from qdrant_client.http import models
-from sentence_transformers import SentenceTransformer
 import logging
 
 # Load environment variables
 load_dotenv(os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 'backend', '.env'))
 
+# Make the repo root and the backend's pooled Qdrant client importable
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(ROOT_DIR)
+sys.path.append(os.path.join(ROOT_DIR, 'backend'))
+from qdrant_pool import get_qdrant_client
+from embedding_service import get_embedding_service
+from job_vectors import title_text, get_vector_layout, dense_vectors_config, sparse_vectors_config
+from scrapers.point_ids import job_point_id
+from scrapers.ingest import (
+    embed_jobs_in_batches, upsert_in_chunks, log_throughput,
+    job_fingerprint, probe_existing, split_changed, touch_points
+)
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Payload indexes used by remove_expired_jobs
+EXPIRY_INDEXES = [
+    ("processed_timestamp", models.PayloadSchemaType.DATETIME),
+    ("closing_date", models.PayloadSchemaType.DATETIME),
+    ("source", models.PayloadSchemaType.KEYWORD),
+]
+
 class LinkedInJobProcessor:
-    def __init__(self):
-        # Get Qdrant configuration
-        qdrant_url = os.getenv("QDRANT_URL")
-        qdrant_api_key = os.getenv("QDRANT_API_KEY")
+    def __init__(self, batch_size=64, upsert_chunk_size=256, upload_workers=1, wait_for_upserts=True,
+                 recreate_collection=False):
+        self.qdrant = get_qdrant_client()
         
-        if qdrant_url and qdrant_api_key:
-            # Use cloud Qdrant
-            self.qdrant = QdrantClient(
-                url=qdrant_url,
-                api_key=qdrant_api_key,
-            )
-        else:
-            # Fallback to local Qdrant
-            self.qdrant = QdrantClient("localhost", port=6333)
+        # Wiping the collection forces a full re-embed on the next run;
+        # by default ingestion is incremental
+        self.recreate_collection = recreate_collection
+        
+        # Ingest tuning: jobs per encode call, points per upsert request,
+        # parallel upsert threads and whether to wait for indexing
+        self.batch_size = batch_size
+        self.upsert_chunk_size = upsert_chunk_size
+        self.upload_workers = upload_workers
+        self.wait_for_upserts = wait_for_upserts
             
-        # Using a smaller, efficient model
-        self.model = SentenceTransformer('all-MiniLM-L6-v2')
+        # Shared, lazily loaded all-MiniLM-L6-v2 (see backend/embedding_service.py)
+        self.embedder = get_embedding_service()
         
         # Ensure collection exists
         self._init_collection()
 
     def _init_collection(self):
         try:
-            # Try to delete existing collection if it exists
-            try:
-                self.qdrant.delete_collection("jobs")
-            except:
-                pass
+            if self.recreate_collection:
+                # Try to delete existing collection if it exists
+                try:
+                    self.qdrant.delete_collection("jobs")
+                except:
+                    pass
             
-            # Create new collection with correct vector size
-            self.qdrant.create_collection(
-                collection_name="jobs",
-                vectors_config=models.VectorParams(
-                    size=384,  # Match the dimension of all-MiniLM-L6-v2 model
-                    distance=models.Distance.COSINE
+            # Keep existing points for incremental ingestion
+            if not self.qdrant.collection_exists("jobs"):
+                # Create new collection with title/content vectors of the
+                # all-MiniLM-L6-v2 dimension plus a sparse keyword vector
+                self.qdrant.create_collection(
+                    collection_name="jobs",
+                    vectors_config=dense_vectors_config(),
+                    sparse_vectors_config=sparse_vectors_config()
                 )
-            )
+            
+            self._ensure_expiry_indexes()
         except Exception as e:
             logger.error(f"Failed to initialize collection: {str(e)}")
 
+    def _ensure_expiry_indexes(self):
+        # Indexes backing the filtered expiry deletes; collections created
+        # before they existed get them on the next run
+        existing = self.qdrant.get_collection("jobs").payload_schema or {}
+        for field_name, field_schema in EXPIRY_INDEXES:
+            if field_name in existing:
+                continue
+            self.qdrant.create_payload_index(
+                collection_name="jobs",
+                field_name=field_name,
+                field_schema=field_schema
+            )
+            logger.info(f"Created payload index on {field_name}")
+
+    def _job_text(self, job):
+        # Create text for the title embedding
+        return title_text(job)
+
     def _create_job_embedding(self, job):
-        # Create text for embedding
-        text = f"{job['title']} {job['company']} {job['location']}"
         # Get embedding as a list
-        return self.model.encode(text).tolist()
+        return self.embedder.encode_one(self._job_text(job))
+
+    def point_id(self, job):
+        # Qdrant point id a scraped job is stored under
+        return job_point_id(job)
 
-    def _convert_listing_id(self, listing_id):
-        # Extract the numeric part from the LinkedIn listing ID
-        try:
-            return int(listing_id.split(':')[-1])
-        except:
-            # Fallback to hash if conversion fails
-            return abs(hash(listing_id))
-    
     def process_jobs(self, jobs):
-        # Get existing job IDs from Qdrant
-        existing_ids = set()
-        offset = 0
-        logger.info("Starting to fetch existing jobs...")
-        
-        while True:
-            points = self.qdrant.scroll(
-                collection_name="jobs",
-                offset=offset,
-                limit=100,
-                with_payload=True
-            )[0]
-            if not points:
-                logger.info(f"Finished fetching existing jobs. Total found: {len(existing_ids)}")
-                break
-            existing_ids.update(p.id for p in points)
-            offset += len(points)
-            logger.info(f"Fetched batch of {len(points)} jobs. Total so far: {len(existing_ids)}")
-    
-        # Process new jobs and updates
-        logger.info(f"Processing {len(jobs)} new jobs...")
+        # Fingerprint the scraped jobs
+        logger.info(f"Processing {len(jobs)} scraped jobs...")
+        now = datetime.now().isoformat()
+        candidates = []
         for job in jobs:
-            # Convert LinkedIn listing ID to valid Qdrant point ID
-            job_id = self._convert_listing_id(job['listing_id'])
-            
-            # Skip if job already exists
-            if job_id in existing_ids:
-                continue
-    
-            # Create embedding
-            embedding = self._create_job_embedding(job)
+            # Convert LinkedIn listing ID to a stable Qdrant point ID
+            job_id = self.point_id(job)
+            job['content_hash'] = job_fingerprint(job)
             
             # Add timestamp for expiry checking
-            job['processed_timestamp'] = datetime.now().isoformat()
-            
-            # Upload to Qdrant
-            self.qdrant.upsert(
-                collection_name="jobs",
-                points=[
-                    models.PointStruct(
-                        id=job_id,
-                        vector=embedding,
-                        payload=job
-                    )
-                ]
+            job['processed_timestamp'] = now
+            candidates.append((job_id, job))
+        
+        # Look up only the ids of this scrape instead of scanning the collection
+        existing_hashes = probe_existing(self.qdrant, [job_id for job_id, _ in candidates])
+        logger.info(f"{len(existing_hashes)} of {len(candidates)} scraped jobs already stored")
+        
+        # Only new or changed listings are re-embedded and uploaded
+        new_jobs, unchanged_ids = split_changed(candidates, existing_hashes)
+        logger.info(f"{len(new_jobs)} new or changed jobs, {len(unchanged_ids)} unchanged")
+        
+        # Unchanged listings only get their expiry timestamp refreshed
+        if unchanged_ids:
+            touch_points(
+                self.qdrant,
+                unchanged_ids,
+                {'processed_timestamp': now},
+                wait=self.wait_for_upserts
             )
+        
+        if not new_jobs:
+            logger.info("No new jobs to ingest")
+            return
+        
+        # Create embeddings in batches
+        started = time.perf_counter()
+        layout, sparse_names = get_vector_layout(self.qdrant, refresh=True)
+        embeddings = embed_jobs_in_batches(
+            self.embedder,
+            [job for _, job in new_jobs],
+            layout,
+            sparse_names,
+            batch_size=self.batch_size
+        )
+        log_throughput("Embedding", len(new_jobs), started)
+        
+        # Upload to Qdrant in chunks
+        points = [
+            models.PointStruct(id=job_id, vector=embedding, payload=job)
+            for (job_id, job), embedding in zip(new_jobs, embeddings)
+        ]
+        started = time.perf_counter()
+        upsert_in_chunks(
+            self.qdrant,
+            points,
+            chunk_size=self.upsert_chunk_size,
+            workers=self.upload_workers,
+            wait=self.wait_for_upserts
+        )
+        log_throughput("Upload", len(points), started)
 
-    def remove_expired_jobs(self, days_threshold=30):
-        # Calculate cutoff date
-        cutoff_date = datetime.now() - timedelta(days=days_threshold)
+    def _expiry_filters(self, days_threshold, source_thresholds, expire_closed):
+        now = datetime.now()
+        filters = []
         
-        # Get all points
-        offset = 0
-        while True:
-            points = self.qdrant.scroll(
-                collection_name="jobs",
-                offset=offset,
-                limit=100,
-                with_payload=True
-            )[0]
-            
-            if not points:
-                break
-                
-            # Find expired jobs
-            expired_ids = []
-            for point in points:
-                processed_date = datetime.fromisoformat(
-                    point.payload.get('processed_timestamp', datetime.now().isoformat())
+        # Default threshold for every source without its own threshold
+        overridden = list(source_thresholds)
+        filters.append(("default", models.Filter(
+            must=[
+                models.FieldCondition(
+                    key="processed_timestamp",
+                    range=models.DatetimeRange(lt=now - timedelta(days=days_threshold))
                 )
-                if processed_date < cutoff_date:
-                    expired_ids.append(point.id)
-            
-            # Delete expired jobs
-            if expired_ids:
-                self.qdrant.delete(
-                    collection_name="jobs",
-                    points_selector=models.PointIdsList(
-                        points=expired_ids
+            ],
+            must_not=[
+                models.FieldCondition(key="source", match=models.MatchAny(any=overridden))
+            ] if overridden else None
+        )))
+        
+        # Per-source thresholds, e.g. {'topjobs': 14}
+        for source, days in source_thresholds.items():
+            filters.append((source, models.Filter(
+                must=[
+                    models.FieldCondition(key="source", match=models.MatchValue(value=source)),
+                    models.FieldCondition(
+                        key="processed_timestamp",
+                        range=models.DatetimeRange(lt=now - timedelta(days=days))
                     )
-                )
-            
-            offset += len(points)
\ No newline at end of file
+                ]
+            )))
+        
+        # Listings with a known closing date (TopJobs) expire once it has
+        # passed. Closing dates are stored as midnight, so compare against
+        # the start of today to keep listings open through their last day
+        if expire_closed:
+            today = now.replace(hour=0, minute=0, second=0, microsecond=0)
+            filters.append(("closed", models.Filter(
+                must=[
+                    models.FieldCondition(
+                        key="closing_date",
+                        range=models.DatetimeRange(lt=today)
+                    )
+                ]
+            )))
+        return filters
+
+    def remove_expired_jobs(self, days_threshold=30, source_thresholds=None, expire_closed=False, dry_run=False):
+        """Delete expired jobs with one server-side filtered delete.
+
+        Returns the number of expired points found; a point matched by
+        several rules is counted once. With dry_run=True nothing is
+        deleted and the matches of each rule are logged as well.
+        """
+        filters = self._expiry_filters(days_threshold, source_thresholds or {}, expire_closed)
+        expired_filter = models.Filter(should=[expiry_filter for _, expiry_filter in filters])
+        
+        if dry_run:
+            for rule, expiry_filter in filters:
+                matched = self.qdrant.count(collection_name="jobs", count_filter=expiry_filter, exact=True).count
+                logger.info(f"[dry run] {matched} jobs match expiry rule {rule}")
+        
+        expired = self.qdrant.count(collection_name="jobs", count_filter=expired_filter, exact=True).count
+        if dry_run:
+            logger.info(f"[dry run] {expired} jobs would expire")
+            return expired
+        
+        if expired:
+            self.qdrant.delete(
+                collection_name="jobs",
+                points_selector=models.FilterSelector(filter=expired_filter)
+            )
+        logger.info(f"Removed {expired} expired jobs")
+        return expired
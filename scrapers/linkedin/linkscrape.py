@@ -2,80 +2,184 @@ import asyncio
 import json
 import os
 from datetime import datetime
-from playwright.async_api import async_playwright
 import logging
-import json
-import os
-from datetime import datetime
+from playwright.async_api import TimeoutError as PlaywrightTimeoutError
 from scrapers.linkedin.job_processor import LinkedInJobProcessor  # Fixed import path
+from scrapers.browser_pool import BrowserPool
+from scrapers.linkedin.guest_api import fetch_guest_jobs
 
 logger = logging.getLogger(__name__)
 
 MAX_JOBS = 1000
 INITIAL_URL = "https://www.linkedin.com/jobs/search/?keywords=Software%20Developer&location=Sri%20Lanka&geoId=100446352&trk=public_jobs_jobs-search-bar_search-submit&position=1"
+# "http" tries the guest job-card endpoint before the browser, "browser" skips it
+FETCH_MODE = os.getenv("LINKEDIN_FETCH_MODE", "http")
+# Adaptive scrolling waits for new cards instead of sleeping fixed intervals
+ADAPTIVE_SCROLL = os.getenv("LINKEDIN_ADAPTIVE_SCROLL", "1") != "0"
+LOAD_TIMEOUT_MS = int(os.getenv("LINKEDIN_LOAD_TIMEOUT_MS", "5000"))
+BLOCKED_RESOURCE_TYPES = {"image", "font", "media"}
+TRACKER_HOSTS = ("google-analytics.com", "googletagmanager.com", "doubleclick.net", "px.ads.linkedin.com", "bat.bing.com")
+
+# Returns the cards from index `start` on, plus the total card count
+EXTRACT_CARDS_SCRIPT = '''(start) => {
+    const cards = Array.from(document.querySelectorAll('div.base-card'));
+    return {
+        count: cards.length,
+        jobs: cards.slice(start).map(job => ({
+            title: job.querySelector('h3.base-search-card__title')?.innerText?.trim() || '',
+            company: (job.querySelector('h4.base-search-card__subtitle a') || job.querySelector('h4.base-search-card__subtitle'))?.innerText?.trim() || '',
+            location: job.querySelector('span.job-search-card__location')?.innerText?.trim() || '',
+            posted_date: (job.querySelector('time.job-search-card__listdate') || job.querySelector('time.job-search-card__listdate--new'))?.innerText?.trim() || '',
+            job_url: job.querySelector('a.base-card__full-link')?.href || '',
+            listing_id: job.getAttribute('data-entity-urn') || '',
+            source: 'linkedin'
+        })).filter(job => job.listing_id)
+    };
+}'''
+
 OUTPUT_FILE = os.path.join(os.path.dirname(__file__), "..", "..", "frontend", "public", "data", "linkedin_jobs.json")
 
-async def scrape_linkedin_jobs():
+async def scrape_linkedin_jobs(pool=None, fetch_mode=None, search_url=None, seen_job_ids=None, max_jobs=MAX_JOBS,
+                               session=None):
+    # search_url defaults to INITIAL_URL; pass a shared seen_job_ids set to
+    # dedupe listings across several searches and a shared aiohttp session
+    # to reuse its pooled connections (see crawl_planner.py)
+    search_url = search_url or INITIAL_URL
+    seen_job_ids = seen_job_ids if seen_job_ids is not None else set()
+
+    # Fetch the job-card fragments over plain HTTP first; a headless browser
+    # is only needed when the guest endpoint is unavailable
+    fetch_mode = fetch_mode or FETCH_MODE
+    if fetch_mode == "http":
+        try:
+            # Overlapping searches may find no new jobs; that is still a success
+            jobs = await fetch_guest_jobs(search_url, max_jobs=max_jobs, seen_job_ids=seen_job_ids, session=session)
+            logger.info(f"LinkedIn scraping completed over HTTP. New jobs found: {len(jobs)}")
+            return jobs
+        except Exception as e:
+            logger.warning(f"Guest API failed, falling back to the browser: {str(e)}")
+
+    return await scrape_linkedin_jobs_browser(pool, search_url, seen_job_ids, max_jobs)
+
+async def _block_heavy_resources(route):
+    # Images, fonts and trackers are not needed to read the job cards
+    request = route.request
+    if request.resource_type in BLOCKED_RESOURCE_TYPES or any(host in request.url for host in TRACKER_HOSTS):
+        await route.abort()
+    else:
+        await route.continue_()
+
+async def _wait_for_more_cards(page, count, timeout):
+    # Resolves as soon as the list grows past `count` cards
     try:
-        all_jobs = []
-        seen_job_ids = set()
-        stuck_count = 0
-
-        async with async_playwright() as p:
-            browser = await p.chromium.launch(headless=True)
-            context = await browser.new_context(
-                user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
-                viewport={"width": 1200, "height": 2000}
-            )
-            page = await context.new_page()
-
-            await page.goto(INITIAL_URL, timeout=60000)
+        await page.wait_for_function(
+            "n => document.querySelectorAll('div.base-card').length > n",
+            arg=count,
+            timeout=timeout
+        )
+        return True
+    except PlaywrightTimeoutError:
+        return False
+
+async def _scroll_adaptive(page, seen_job_ids, max_jobs):
+    all_jobs = []
+    extracted = 0
+    stuck_count = 0
+
+    while len(all_jobs) < max_jobs and stuck_count < 5:
+        # Only read the cards added since the last pass
+        result = await page.evaluate(EXTRACT_CARDS_SCRIPT, extracted)
+        extracted = result['count']
+
+        new_jobs = [job for job in result['jobs'] if job['listing_id'] not in seen_job_ids]
+        if new_jobs:
+            all_jobs.extend(new_jobs)
+            seen_job_ids.update(job['listing_id'] for job in new_jobs)
+            logger.info(f"Added {len(new_jobs)} new jobs. Total jobs collected: {len(all_jobs)}")
+
+        # Trigger the next batch and wait for it instead of sleeping
+        await page.evaluate('window.scrollTo(0, document.body.scrollHeight)')
+        if await _wait_for_more_cards(page, extracted, LOAD_TIMEOUT_MS):
+            stuck_count = 0
+            continue
+
+        try:
+            await page.click('button.infinite-scroller__show-more-button', timeout=2000)
+        except Exception:
+            pass
+        if await _wait_for_more_cards(page, extracted, LOAD_TIMEOUT_MS):
+            stuck_count = 0
+        else:
+            stuck_count += 1
+            logger.info(f"No new jobs loaded (attempt {stuck_count}/5)")
+
+    return all_jobs[:max_jobs]
+
+async def _scroll_with_sleeps(page, seen_job_ids, max_jobs):
+    all_jobs = []
+    stuck_count = 0
+
+    while len(all_jobs) < max_jobs and stuck_count < 5:
+        logger.info(f"Processing... Total jobs collected: {len(all_jobs)}")
+
+        # Scroll to load more content
+        for _ in range(3):
+            await page.evaluate('window.scrollBy(0, 800)')
+            await asyncio.sleep(0.3)
+
+        await asyncio.sleep(1.5)
+
+        # Extract jobs
+        jobs = (await page.evaluate(EXTRACT_CARDS_SCRIPT, 0))['jobs']
+
+        # Process new jobs
+        new_jobs = [job for job in jobs if job['listing_id'] not in seen_job_ids]
+        
+        if new_jobs:
+            all_jobs.extend(new_jobs)
+            seen_job_ids.update(job['listing_id'] for job in new_jobs)
+            logger.info(f"Added {len(new_jobs)} new jobs")
+            stuck_count = 0
+        else:
+            stuck_count += 1
+            logger.info(f"No new jobs found (attempt {stuck_count}/5)")
+
+            try:
+                await page.click('button.infinite-scroller__show-more-button', timeout=2000)
+                await asyncio.sleep(2)
+            except:
+                await page.evaluate('window.scrollTo(0, document.body.scrollHeight)')
+                await asyncio.sleep(2)
+
+    return all_jobs
+
+async def scrape_linkedin_jobs_browser(pool=None, search_url=None, seen_job_ids=None, max_jobs=MAX_JOBS, adaptive=None):
+    search_url = search_url or INITIAL_URL
+    seen_job_ids = seen_job_ids if seen_job_ids is not None else set()
+    adaptive = ADAPTIVE_SCROLL if adaptive is None else adaptive
+
+    # Without a shared pool, run on a single-browser pool of our own
+    if pool is None:
+        try:
+            async with BrowserPool(browsers=1, contexts_per_browser=1) as own_pool:
+                return await scrape_linkedin_jobs_browser(own_pool, search_url, seen_job_ids, max_jobs, adaptive)
+        except Exception as e:
+            logger.error(f"Error scraping LinkedIn jobs: {str(e)}")
+            return []
+
+    try:
+        async with pool.page() as page:
+            if adaptive:
+                await page.route("**/*", _block_heavy_resources)
+
+            await page.goto(search_url, timeout=60000)
             await page.wait_for_selector("div.base-card", timeout=30000)
 
-            while len(all_jobs) < MAX_JOBS and stuck_count < 5:
-                logger.info(f"Processing... Total jobs collected: {len(all_jobs)}")
-
-                # Scroll to load more content
-                for _ in range(3):
-                    await page.evaluate('window.scrollBy(0, 800)')
-                    await asyncio.sleep(0.3)
-
-                await asyncio.sleep(1.5)
-
-                # Extract jobs
-                jobs = await page.evaluate('''() => {
-                    const cards = Array.from(document.querySelectorAll('div.base-card'));
-                    return cards.map(job => ({
-                        title: job.querySelector('h3.base-search-card__title')?.innerText?.trim() || '',
-                        company: job.querySelector('h4.base-search-card__subtitle a')?.innerText?.trim() || '',
-                        location: job.querySelector('span.job-search-card__location')?.innerText?.trim() || '',
-                        posted_date: job.querySelector('time.job-search-card__listdate')?.innerText?.trim() || '',
-                        job_url: job.querySelector('a.base-card__full-link')?.href || '',
-                        listing_id: job.getAttribute('data-entity-urn') || '',
-                        source: 'linkedin'
-                    })).filter(job => job.listing_id);
-                }''')
-
-                # Process new jobs
-                new_jobs = [job for job in jobs if job['listing_id'] not in seen_job_ids]
-                
-                if new_jobs:
-                    all_jobs.extend(new_jobs)
-                    seen_job_ids.update(job['listing_id'] for job in new_jobs)
-                    logger.info(f"Added {len(new_jobs)} new jobs")
-                    stuck_count = 0
-                else:
-                    stuck_count += 1
-                    logger.info(f"No new jobs found (attempt {stuck_count}/5)")
-
-                    try:
-                        await page.click('button.infinite-scroller__show-more-button', timeout=2000)
-                        await asyncio.sleep(2)
-                    except:
-                        await page.evaluate('window.scrollTo(0, document.body.scrollHeight)')
-                        await asyncio.sleep(2)
-
-            await browser.close()
+            if adaptive:
+                all_jobs = await _scroll_adaptive(page, seen_job_ids, max_jobs)
+            else:
+                all_jobs = await _scroll_with_sleeps(page, seen_job_ids, max_jobs)
+
             logger.info(f"LinkedIn scraping completed. Total jobs found: {len(all_jobs)}")
             return all_jobs
 
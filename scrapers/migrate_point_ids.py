@@ -0,0 +1,74 @@
+import os
+import sys
+import argparse
+import logging
+
+# Make the repo root and the backend's pooled Qdrant client importable
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT_DIR)
+sys.path.append(os.path.join(ROOT_DIR, 'backend'))
+from qdrant_pool import get_qdrant_client
+from qdrant_client.http import models
+from scrapers.point_ids import job_point_id
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def migrate_point_ids(client, collection_name="jobs", page_size=256, dry_run=False):
+    """One-off rewrite of existing points onto the deterministic id scheme.
+
+    Points whose id differs from job_point_id(payload) are copied to the
+    new id (vector and payload unchanged) and the old id is deleted.
+    Points that were duplicates of one listing collapse into one.
+    """
+    stats = {'examined': 0, 'migrated': 0, 'skipped': 0}
+    offset = None
+
+    while True:
+        points, offset = client.scroll(
+            collection_name=collection_name,
+            offset=offset,
+            limit=page_size,
+            with_payload=True,
+            with_vectors=True
+        )
+
+        moved, old_ids = [], []
+        for point in points:
+            stats['examined'] += 1
+            payload = point.payload or {}
+            if not payload.get('listing_id'):
+                stats['skipped'] += 1
+                continue
+
+            new_id = job_point_id(payload)
+            if str(point.id) == new_id:
+                continue
+
+            moved.append(models.PointStruct(id=new_id, vector=point.vector, payload=payload))
+            old_ids.append(point.id)
+
+        if moved and not dry_run:
+            # Write the new points before removing the old ones
+            client.upsert(collection_name=collection_name, points=moved, wait=True)
+            client.delete(
+                collection_name=collection_name,
+                points_selector=models.PointIdsList(points=old_ids)
+            )
+        stats['migrated'] += len(moved)
+
+        if offset is None:
+            break
+
+    prefix = "[dry run] " if dry_run else ""
+    logger.info(f"{prefix}Examined {stats['examined']} points, migrated {stats['migrated']}, "
+                f"skipped {stats['skipped']} without listing_id")
+    return stats
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rewrite job points onto deterministic ids")
+    parser.add_argument("--dry-run", action="store_true", help="only count the points that would move")
+    parser.add_argument("--page-size", type=int, default=256)
+    args = parser.parse_args()
+
+    migrate_point_ids(get_qdrant_client(), page_size=args.page_size, dry_run=args.dry_run)
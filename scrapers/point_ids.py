@@ -0,0 +1,14 @@
+import uuid
+
+def job_point_id(job):
+    """Deterministic Qdrant point id for a job payload.
+
+    UUIDv5 over "source:listing_id", so the same listing maps to the same
+    point in every process and re-ingesting it overwrites instead of
+    duplicating. Listing ids that already carry their source prefix
+    (e.g. "topjobs:1234") are used as they are.
+    """
+    source = job.get('source') or 'linkedin'
+    listing_id = str(job['listing_id'])
+    key = listing_id if listing_id.startswith(f"{source}:") else f"{source}:{listing_id}"
+    return str(uuid.uuid5(uuid.NAMESPACE_URL, key))
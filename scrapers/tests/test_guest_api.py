@@ -0,0 +1,131 @@
+import os
+import sys
+import asyncio
+import pytest
+
+# Make the scrapers package importable when run from anywhere
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(ROOT)
+
+from scrapers.linkedin.guest_api import parse_job_cards, fetch_guest_jobs, guest_api_url, GuestApiError
+
+FIXTURE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "linkedin_guest_search.html")
+SEARCH_URL = "https://www.linkedin.com/jobs/search?keywords=&location=Sri%20Lanka&geoId=100446352&position=1&pageNum=0"
+
+# What the browser scraper returns for the same cards
+EXPECTED_JOBS = [
+    {
+        'title': 'Stores Assistant',
+        'company': 'Cenmetrix',
+        'location': 'Colombo, Western Province, Sri Lanka',
+        'posted_date': '5 days ago',
+        'job_url': 'https://lk.linkedin.com/jobs/view/stores-assistant-at-cenmetrix-4192884249?position=1&pageNum=0&refId=s7V7mSX5gk4u6asyU2%2Bizg%3D%3D&trackingId=xVe%2F7ortrUL3PvTXO0bNBw%3D%3D',
+        'listing_id': 'urn:li:jobPosting:4192884249',
+        'source': 'linkedin'
+    },
+    {
+        'title': 'Civic Centre - Casual Positions',
+        'company': 'Shire of Broome',
+        'location': 'Civic Centre, Northern Province, Sri Lanka',
+        'posted_date': '2 hours ago',
+        'job_url': 'https://lk.linkedin.com/jobs/view/civic-centre-casual-positions-at-shire-of-broome-4157857769?position=2&pageNum=0',
+        'listing_id': 'urn:li:jobPosting:4157857769',
+        'source': 'linkedin'
+    },
+]
+
+def load_fixture():
+    with open(FIXTURE, 'r', encoding='utf-8') as f:
+        return f.read()
+
+def card(inner, urn="urn:li:jobPosting:1"):
+    return f'<div class="base-card" data-entity-urn="{urn}">{inner}</div>'
+
+def test_parse_job_cards_matches_browser_schema():
+    assert parse_job_cards(load_fixture()) == EXPECTED_JOBS
+
+def test_company_without_link():
+    html = card('<h4 class="base-search-card__subtitle"> Acme </h4>')
+    assert parse_job_cards(html)[0]['company'] == 'Acme'
+
+def test_company_link_wins_over_subtitle_text():
+    html = card('<h4 class="base-search-card__subtitle"><a href="#"> Acme </a> <span>Promoted</span></h4>')
+    assert parse_job_cards(html)[0]['company'] == 'Acme'
+
+def test_new_listing_date():
+    html = card('<time class="job-search-card__listdate--new"> 3 hours ago </time>')
+    assert parse_job_cards(html)[0]['posted_date'] == '3 hours ago'
+
+def test_missing_fields_are_empty_strings():
+    jobs = parse_job_cards(card(''))
+    assert jobs == [{
+        'title': '', 'company': '', 'location': '', 'posted_date': '',
+        'job_url': '', 'listing_id': 'urn:li:jobPosting:1', 'source': 'linkedin'
+    }]
+
+def test_cards_without_listing_id_are_skipped():
+    assert parse_job_cards(card('<h3 class="base-search-card__title">Ad</h3>', urn='')) == []
+
+def test_parse_job_cards_empty_page():
+    assert parse_job_cards('') == []
+
+class FakeResponse:
+    def __init__(self, status, text=''):
+        self.status = status
+        self._text = text
+
+    async def text(self):
+        return self._text
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+class FakeSession:
+    """Serves the fixture as the first page and ends the crawl after it."""
+
+    def __init__(self, html):
+        self.html = html
+        self.urls = []
+
+    def get(self, url):
+        self.urls.append(url)
+        if url == guest_api_url(SEARCH_URL, 0):
+            return FakeResponse(200, self.html)
+        return FakeResponse(400)
+
+def test_fetch_guest_jobs_from_fixture():
+    session = FakeSession(load_fixture())
+    seen = {'urn:li:jobPosting:4157857769'}
+    jobs = asyncio.run(fetch_guest_jobs(SEARCH_URL, seen_job_ids=seen, session=session, page_delay=0))
+
+    assert jobs == EXPECTED_JOBS[:1]
+    assert seen == {job['listing_id'] for job in EXPECTED_JOBS}
+    assert session.urls == [guest_api_url(SEARCH_URL, 0), guest_api_url(SEARCH_URL, 2)]
+
+def test_fetch_guest_jobs_all_seen_is_not_a_failure():
+    seen = {job['listing_id'] for job in EXPECTED_JOBS}
+    jobs = asyncio.run(fetch_guest_jobs(SEARCH_URL, seen_job_ids=seen, session=FakeSession(load_fixture()), page_delay=0))
+    assert jobs == []
+
+def test_fetch_guest_jobs_empty_first_page_raises():
+    with pytest.raises(GuestApiError):
+        asyncio.run(fetch_guest_jobs(SEARCH_URL, session=FakeSession('<li></li>'), page_delay=0))
+
+class ErrorSession:
+    def get(self, url):
+        return FakeResponse(503)
+
+def test_no_backoff_after_last_attempt(monkeypatch):
+    import scrapers.linkedin.guest_api as guest_api
+    sleeps = []
+
+    async def fake_sleep(seconds):
+        sleeps.append(seconds)
+
+    monkeypatch.setattr(guest_api.asyncio, 'sleep', fake_sleep)
+    with pytest.raises(GuestApiError):
+        asyncio.run(guest_api._fetch_fragment(ErrorSession(), SEARCH_URL, retries=3))
+    assert len(sleeps) == 2
@@ -1,84 +1,150 @@
 import asyncio
 import aiohttp
 import os
+import sys
+import time
 from dotenv import load_dotenv
 from bs4 import BeautifulSoup
 from datetime import datetime
-from qdrant_client import QdrantClient
-from sentence_transformers import SentenceTransformer
-from playwright.async_api import async_playwright
 import logging
 
 # Load environment variables
 load_dotenv(os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 'backend', '.env'))
 
+# Make the repo root and the backend's pooled Qdrant client importable
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(ROOT_DIR)
+sys.path.append(os.path.join(ROOT_DIR, 'backend'))
+from qdrant_pool import get_qdrant_client
+from embedding_service import get_embedding_service
+from job_vectors import title_text, get_vector_layout
+from qdrant_client.http import models
+from scrapers.browser_pool import BrowserPool
+from scrapers.point_ids import job_point_id
+from scrapers.ingest import (
+    embed_jobs_in_batches, upsert_in_chunks, log_throughput,
+    job_fingerprint, probe_existing, split_changed, touch_points
+)
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 class TopJobsProcessor:
-    def __init__(self):
-        # Get Qdrant configuration
-        qdrant_url = os.getenv("QDRANT_URL")
-        qdrant_api_key = os.getenv("QDRANT_API_KEY")
+    def __init__(self, batch_size=64, upsert_chunk_size=256, upload_workers=1, wait_for_upserts=True):
+        self.qdrant = get_qdrant_client()
         
-        if qdrant_url and qdrant_api_key:
-            # Use cloud Qdrant
-            self.qdrant = QdrantClient(
-                url=qdrant_url,
-                api_key=qdrant_api_key,
-            )
-        else:
-            # Fallback to local Qdrant
-            self.qdrant = QdrantClient("localhost", port=6333)
+        # Ingest tuning, see LinkedInJobProcessor
+        self.batch_size = batch_size
+        self.upsert_chunk_size = upsert_chunk_size
+        self.upload_workers = upload_workers
+        self.wait_for_upserts = wait_for_upserts
             
-        self.model = SentenceTransformer('all-MiniLM-L6-v2')
+        self.embedder = get_embedding_service()
+
+    def _job_text(self, job):
+        return title_text(job)
 
     def _create_job_embedding(self, job):
-        text = f"{job['title']} {job['company']} {job['location']}"
-        return self.model.encode(text).tolist()
+        return self.embedder.encode_one(self._job_text(job))
+
+    def _parse_date(self, value):
+        # TopJobs shows dates like "Wed Apr 09 2025"; keep other formats working
+        for date_format in ("%a %b %d %Y", "%Y-%m-%d", "%d/%m/%Y", "%d-%m-%Y", "%b %d, %Y"):
+            try:
+                return datetime.strptime((value or '').strip(), date_format).isoformat()
+            except ValueError:
+                continue
+        return None
+
+    def _map_job(self, job, processed_timestamp):
+        # Convert TopJobs format to LinkedIn schema with correct URL format
+        processed_job = {
+            'title': job['job_title'],
+            'company': job['company'],
+            'location': job['location'],
+            'type': 'Full Time',
+            'posted_date': job['opening_date'],
+            'description': job['description'],
+            'job_url': f"https://topjobs.lk/employer/JobAdvertismentServlet?rid=0&ac=DEFZZZ&jc={job['vacancy_number']}&ec=DEFZZZ&pg=applicant/vacancybyfunctionalarea.jsp",
+            'listing_id': f"topjobs:{job['vacancy_number']}",
+            'source': 'topjobs',
+            'processed_timestamp': processed_timestamp
+        }
+        # Stored as ISO datetime so expiry can range-filter on it
+        closing_date = self._parse_date(job.get('closing_date'))
+        if closing_date:
+            processed_job['closing_date'] = closing_date
+        processed_job['content_hash'] = job_fingerprint(processed_job)
+        return processed_job
 
     def process_jobs(self, jobs):
+        # Map rows one by one so a malformed row only drops itself
+        now = datetime.now().isoformat()
+        candidates = []
         for job in jobs:
             try:
-                # Convert TopJobs format to LinkedIn schema with correct URL format
-                processed_job = {
-                    'title': job['job_title'],
-                    'company': job['company'],
-                    'location': job['location'],
-                    'type': 'Full Time',
-                    'posted_date': job['opening_date'],
-                    'description': job['description'],
-                    'job_url': f"https://topjobs.lk/employer/JobAdvertismentServlet?rid=0&ac=DEFZZZ&jc={job['vacancy_number']}&ec=DEFZZZ&pg=applicant/vacancybyfunctionalarea.jsp",
-                    'listing_id': f"topjobs:{job['vacancy_number']}",
-                    'source': 'topjobs',
-                    'processed_timestamp': datetime.now().isoformat()
-                }
-
-                # Create embedding
-                job_vector = self._create_job_embedding(processed_job)
-
-                # Store in Qdrant
-                self.qdrant.upsert(
-                    collection_name="jobs",
-                    points=[{
-                        'id': abs(hash(processed_job['listing_id'])),
-                        'vector': job_vector,
-                        'payload': processed_job
-                    }]
-                )
-                logger.info(f"Processed job: {processed_job['title']}")
-
+                processed_job = self._map_job(job, now)
+                candidates.append((job_point_id(processed_job), processed_job))
             except Exception as e:
                 logger.error(f"Error processing job {job.get('job_title', 'Unknown')}: {str(e)}")
 
-async def scrape_topjobs():
+        # Skip rows whose stored content is unchanged, only refreshing their timestamp
+        existing_hashes = probe_existing(self.qdrant, [point_id for point_id, _ in candidates])
+        mapped, unchanged_ids = split_changed(candidates, existing_hashes)
+        logger.info(f"TopJobs: {len(mapped)} new or changed rows, {len(unchanged_ids)} unchanged")
+        if unchanged_ids:
+            touch_points(
+                self.qdrant,
+                unchanged_ids,
+                {'processed_timestamp': now},
+                wait=self.wait_for_upserts
+            )
+
+        if not mapped:
+            logger.info("No TopJobs rows to ingest")
+            return
+
+        # Create embeddings in batches
+        started = time.perf_counter()
+        layout, sparse_names = get_vector_layout(self.qdrant, refresh=True)
+        embeddings = embed_jobs_in_batches(
+            self.embedder,
+            [job for _, job in mapped],
+            layout,
+            sparse_names,
+            batch_size=self.batch_size
+        )
+        log_throughput("TopJobs embedding", len(mapped), started)
+
+        # Store in Qdrant, falling back to per-row writes for a failing chunk
+        points = [
+            models.PointStruct(id=point_id, vector=embedding, payload=job)
+            for (point_id, job), embedding in zip(mapped, embeddings)
+        ]
+        started = time.perf_counter()
+        written = upsert_in_chunks(
+            self.qdrant,
+            points,
+            chunk_size=self.upsert_chunk_size,
+            workers=self.upload_workers,
+            wait=self.wait_for_upserts,
+            isolate_failures=True
+        )
+        log_throughput("TopJobs upload", written, started)
+
+async def scrape_topjobs(pool=None):
+    # Without a shared pool, run on a single-browser pool of our own
+    if pool is None:
+        try:
+            async with BrowserPool(browsers=1, contexts_per_browser=1) as own_pool:
+                return await scrape_topjobs(own_pool)
+        except Exception as e:
+            logger.error(f"TopJobs scraping error: {str(e)}")
+            return []
+
     logger.info("Initializing TopJobs scraper...")
     try:
-        async with async_playwright() as p:
-            logger.info("Launching browser...")
-            browser = await p.chromium.launch(headless=True)
-            page = await browser.new_page(user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36")
-            
+        async with pool.page() as page:
             logger.info("Navigating to TopJobs...")
             await page.goto("https://www.topjobs.lk/applicant/vacancybyfunctionalarea.jsp?FA=SDQ", timeout=60000)
             
@@ -107,7 +173,6 @@ async def scrape_topjobs():
                     logger.error(f"Error processing row: {str(e)}")
             
             logger.info(f"Found {len(jobs)} jobs")
-            await browser.close()
             return jobs
 
     except Exception as e:
@@ -116,7 +181,7 @@ async def scrape_topjobs():
 
 if __name__ == "__main__":
     # Scrape jobs
-    jobs = scrape_topjobs()
+    jobs = asyncio.run(scrape_topjobs())
     
     # Process and store jobs
     processor = TopJobsProcessor()
@@ -1,6 +1,8 @@
 import asyncio
 import sys
 import os
+import time
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
 
 # Load environment variables
@@ -11,146 +13,201 @@ current_dir = os.path.dirname(os.path.abspath(__file__))
 parent_dir = os.path.dirname(current_dir)
 sys.path.append(parent_dir)
 sys.path.append(current_dir)
+sys.path.append(os.path.join(parent_dir, 'backend'))
 
-from scrapers.linkedin.linkscrape import scrape_linkedin_jobs
+from scrapers.linkedin.crawl_planner import crawl_linkedin
 from scrapers.topjobs.topjob import scrape_topjobs, TopJobsProcessor
 from scrapers.linkedin.job_processor import LinkedInJobProcessor
-from qdrant_client import QdrantClient
-from qdrant_client.http import models
+from scrapers.compaction import compact_duplicate_listings
+from scrapers.browser_pool import BrowserPool
+from scrapers.linkedin.enrichment import enrich_jobs
+from qdrant_pool import get_qdrant_client, close_qdrant_client
+from embedding_service import get_embedding_service
 import logging
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Get Qdrant configuration
-def get_qdrant_client():
-    qdrant_url = os.getenv("QDRANT_URL")
-    qdrant_api_key = os.getenv("QDRANT_API_KEY")
-    
-    if qdrant_url and qdrant_api_key:
-        # Use cloud Qdrant
-        try:
-            return QdrantClient(
-                url=qdrant_url,
-                api_key=qdrant_api_key,
-            )
-        except Exception as e:
-            logger.error(f"Failed to connect to cloud Qdrant: {str(e)}")
+# Source scrapers running at once, and threads for embedding/upload
+SCRAPER_CONCURRENCY = int(os.getenv("SCRAPER_CONCURRENCY", "2"))
+INGEST_WORKERS = int(os.getenv("INGEST_WORKERS", "2"))
+
+# Detail pages fetched at once after the LinkedIn scrape (0 disables it),
+# and the request rate allowed per host
+ENRICH_WORKERS = int(os.getenv("ENRICH_WORKERS", "4"))
+ENRICH_RATE_PER_HOST = float(os.getenv("ENRICH_RATE_PER_HOST", "1.0"))
+
+# Run the duplicate-listing compaction during cleanup
+COMPACT_DUPLICATES = os.getenv("COMPACT_DUPLICATES", "0") == "1"
+
+class StageTimer:
+    """Accumulates wall-clock seconds per pipeline stage."""
+
+    def __init__(self):
+        self.timings = {}
+
+    def add(self, stage, seconds):
+        self.timings[stage] = self.timings.get(stage, 0.0) + seconds
+
+    def report(self, total_seconds):
+        logger.info("Stage timings:")
+        for stage, seconds in self.timings.items():
+            logger.info(f"  {stage}: {seconds:.2f}s")
+        logger.info(f"  total wall-clock: {total_seconds:.2f}s")
+
+def prepare_processors():
+    # Initialize processors
+    linkedin_processor = LinkedInJobProcessor()
+    topjobs_processor = TopJobsProcessor()
     
-    # Fallback to local Qdrant
+    # Clean up expired and redundant data
+    logger.info("Cleaning up expired and redundant jobs...")
     try:
-        return QdrantClient("localhost", port=6333)
+        # Remove expired jobs (not seen for 30 days, or past their closing date)
+        linkedin_processor.remove_expired_jobs(days_threshold=30, expire_closed=True)
+        
+        # Deterministic point ids make re-scrapes overwrite in place, so the
+        # full duplicate scan is only needed for data from before the
+        # id migration (scrapers/migrate_point_ids.py)
+        if COMPACT_DUPLICATES:
+            compact_duplicate_listings(get_qdrant_client())
+            
     except Exception as e:
-        logger.error(f"Failed to connect to local Qdrant: {str(e)}")
-        logger.warning("No Qdrant connection available. Some functionality will be limited.")
-        return None
+        logger.error(f"Error during cleanup: {str(e)}")
+    
+    return {'linkedin': linkedin_processor, 'topjobs': topjobs_processor}
 
 async def run_unified_scraper():
+    started = time.perf_counter()
+    timer = StageTimer()
+    loop = asyncio.get_running_loop()
+    executor = ThreadPoolExecutor(max_workers=INGEST_WORKERS + 1)
+    
     try:
-        # Initialize processors
-        linkedin_processor = LinkedInJobProcessor()
-        topjobs_processor = TopJobsProcessor()
+        # Model loading and cleanup run in a thread while the browsers scrape
+        async def timed_prepare():
+            stage_started = time.perf_counter()
+            processors = await loop.run_in_executor(executor, prepare_processors)
+            timer.add("setup and cleanup", time.perf_counter() - stage_started)
+            return processors
+        
+        processors_task = asyncio.ensure_future(timed_prepare())
+        queue = asyncio.Queue()
+        semaphore = asyncio.Semaphore(SCRAPER_CONCURRENCY)
         
-        # Clean up expired and redundant data
-        logger.info("Cleaning up expired and redundant jobs...")
-        try:
-            # Remove expired jobs (older than 30 days)
-            linkedin_processor.remove_expired_jobs(days_threshold=30)
+        async def produce(source, scrape):
+            # scrape(publish) hands each batch to publish as soon as it is
+            # scraped, so ingestion overlaps with the rest of the scrape
+            found = 0
+            
+            async def publish(jobs):
+                nonlocal found
+                if not jobs:
+                    return
+                # Add source field if not present
+                for job in jobs:
+                    job['source'] = source
+                found += len(jobs)
+                await queue.put((source, jobs))
             
-            # Remove duplicate jobs based on listing ID
-            client = get_qdrant_client()
-            seen_listings = set()
-            to_delete = []
-            offset = 0
+            async with semaphore:
+                logger.info(f"Starting {source} scraper...")
+                stage_started = time.perf_counter()
+                try:
+                    await scrape(publish)
+                except Exception as e:
+                    logger.error(f"{source} scraping failed: {str(e)}")
+                timer.add(f"{source} scrape", time.perf_counter() - stage_started)
             
+            if not found:
+                logger.error(f"No {source} data returned")
+            else:
+                logger.info(f"Found {found} {source} listings")
+        
+        async def consume(pool):
+            processors = await processors_task
             while True:
-                points = client.scroll(
-                    collection_name="jobs",
-                    offset=offset,
-                    limit=100,
-                    with_payload=True
-                )[0]
-                
-                if not points:
+                item = await queue.get()
+                if item is None:
                     break
-                    
-                for point in points:
-                    listing_id = point.payload.get('listing_id')
-                    if listing_id in seen_listings:
-                        to_delete.append(point.id)
-                    else:
-                        seen_listings.add(listing_id)
                 
-                offset += len(points)
-            
-            if to_delete:
-                client.delete(
-                    collection_name="jobs",
-                    points_selector=models.PointIdsList(points=to_delete)
-                )
-                logger.info(f"Removed {len(to_delete)} duplicate jobs")
+                # Embedding and Qdrant writes stay off the event loop
+                source, jobs = item
+                stage_started = time.perf_counter()
+                try:
+                    await loop.run_in_executor(executor, processors[source].process_jobs, jobs)
+                    logger.info(f"{source} jobs processed and stored in database")
+                except Exception as e:
+                    logger.error(f"{source} processing failed: {str(e)}")
+                timer.add(f"{source} ingest", time.perf_counter() - stage_started)
                 
-        except Exception as e:
-            logger.error(f"Error during cleanup: {str(e)}")
+                # LinkedIn cards only carry title/company/location; fetch the details
+                if source == 'linkedin' and ENRICH_WORKERS > 0:
+                    stage_started = time.perf_counter()
+                    try:
+                        processor = processors[source]
+                        await enrich_jobs(
+                            get_qdrant_client(),
+                            [(processor.point_id(job), job) for job in jobs],
+                            pool=pool,
+                            workers=ENRICH_WORKERS,
+                            rate_per_host=ENRICH_RATE_PER_HOST,
+                            embedder=processor.embedder
+                        )
+                    except Exception as e:
+                        logger.error(f"{source} enrichment failed: {str(e)}")
+                    timer.add(f"{source} enrichment", time.perf_counter() - stage_started)
         
-        # Run LinkedIn scraper first
-        logger.info("Starting LinkedIn scraper...")
-        try:
-            linkedin_data = await scrape_linkedin_jobs()
-            if linkedin_data and len(linkedin_data) > 0:
-                logger.info(f"Found {len(linkedin_data)} LinkedIn listings")
-                # Add source field if not present
-                for job in linkedin_data:
-                    job['source'] = 'linkedin'
-                linkedin_processor.process_jobs(linkedin_data)
-                logger.info("LinkedIn jobs processed and stored in database")
-            else:
-                logger.error("No LinkedIn data returned")
-        except Exception as e:
-            logger.error(f"LinkedIn scraping failed: {str(e)}")
+        # One warm browser shared by all sources instead of one launch each
+        contexts = max(SCRAPER_CONCURRENCY, ENRICH_WORKERS)
+        async with BrowserPool(browsers=1, contexts_per_browser=contexts) as pool:
+            consumers = [asyncio.ensure_future(consume(pool)) for _ in range(INGEST_WORKERS)]
             
-        # Run TopJobs scraper after LinkedIn
-        logger.info("Starting TopJobs scraper...")
-        try:
-            topjobs_data = await scrape_topjobs()
-            if topjobs_data:
-                logger.info(f"Found {len(topjobs_data)} TopJobs listings")
-                # Add source field for TopJobs
-                for job in topjobs_data:
-                    job['source'] = 'topjobs'
-                topjobs_processor.process_jobs(topjobs_data)
-                logger.info("TopJobs data processed and stored successfully")
-            else:
-                logger.error("No TopJobs data returned")
-        except Exception as e:
-            logger.error(f"TopJobs scraping failed: {str(e)}")
+            async def scrape_linkedin(publish):
+                # Every planned search is ingested as soon as it finishes
+                await crawl_linkedin(pool=pool, on_jobs=publish)
+            
+            async def scrape_topjobs_page(publish):
+                # TopJobs lists everything on one page: a single batch
+                await publish(await scrape_topjobs(pool))
+            
+            await asyncio.gather(
+                produce('linkedin', scrape_linkedin),
+                produce('topjobs', scrape_topjobs_page)
+            )
+            
+            for _ in consumers:
+                await queue.put(None)
+            await asyncio.gather(*consumers)
+            logger.info(f"Browser pool metrics: {pool.metrics}")
         
         logger.info("All scraping completed!")
+        timer.report(time.perf_counter() - started)
+        logger.info(f"Embedding service: {get_embedding_service().stats}")
         return True
         
     except Exception as e:
         logger.error(f"Error in unified scraper: {str(e)}")
         return False
+    finally:
+        executor.shutdown(wait=True)
 
 def get_all_jobs():
     try:
-        client = get_qdrant_client()  # Updated to use cloud Qdrant
+        client = get_qdrant_client()
         
         # Get all jobs without any filters
         all_jobs = []
-        offset = 0
+        offset = None
         
         while True:
-            points = client.scroll(
+            points, offset = client.scroll(
                 collection_name="jobs",
                 offset=offset,
                 limit=100,
                 with_payload=True,
                 with_vectors=False
-            )[0]
-            
-            if not points:
-                break
+            )
                 
             jobs = [{
                 'id': point.id,
@@ -159,7 +216,8 @@ def get_all_jobs():
             } for point in points]
             
             all_jobs.extend(jobs)
-            offset += len(points)
+            if offset is None:
+                break
         
         return all_jobs
         
@@ -175,4 +233,6 @@ if __name__ == "__main__":
     jobs = get_all_jobs()
     logger.info(f"Total jobs in database: {len(jobs)}")
     logger.info(f"LinkedIn jobs: {sum(1 for job in jobs if job['source'] == 'linkedin')}")
-    logger.info(f"TopJobs jobs: {sum(1 for job in jobs if job['source'] == 'topjobs')}")
\ No newline at end of file
+    logger.info(f"TopJobs jobs: {sum(1 for job in jobs if job['source'] == 'topjobs')}")
+    
+    close_qdrant_client()
\ No newline at end of file